@@ -1,5 +1,11 @@
-__all__ = ["Firebase", "Foxbit", "Coingecko"]
+__all__ = [
+    "Firebase", "Foxbit", "Coingecko", "FoxbitPriceStream", "LocalPriceFeed",
+    "http", "deadline", "CircuitOpenError", "DeadlineExceeded", "AsyncCoingecko",
+]
 
+from .resilience import http, deadline, CircuitOpenError, DeadlineExceeded
 from .firebase import Firebase
 from .foxbit import Foxbit
 from .coingecko import Coingecko
+from .foxbit_stream import FoxbitPriceStream, LocalPriceFeed
+from .coingecko_async import AsyncCoingecko
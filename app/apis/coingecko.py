@@ -2,19 +2,80 @@
 
 import requests
 from requests.models import Response
+from urllib.parse import urlencode
+import numpy as np
 import pandas as pd
 import os
 
-from infra import log, COINGECKO_API_KEY
+from infra import (
+    log, COINGECKO_API_KEY, HTTP_CACHE_ENABLED, HTTP_CACHE_DIR, build_cached_session
+)
+from .resilience import http
 
 
 class Coingecko:
     """Coingecko
     """
 
-    def __init__(self, coingecko_api_key: str = COINGECKO_API_KEY) -> None:
+    # Freshness overrides (seconds) for endpoints whose upstream headers
+    # expire far sooner than the data actually changes.
+    CACHE_TTLS: dict = {
+        "/coins/list": 24 * 3600,
+        "/market_chart": 3600,
+    }
+
+    # Foxbit currency symbols of the coins the evaluator trades, by Coingecko id.
+    SYMBOL_IDS: dict = {
+        "btc": "bitcoin",
+        "eth": "ethereum",
+        "sol": "solana",
+        "usdt": "tether",
+        "usdc": "usd-coin",
+        "xrp": "ripple",
+        "ada": "cardano",
+        "doge": "dogecoin",
+        "ltc": "litecoin",
+        "dot": "polkadot",
+        "link": "chainlink",
+        "matic": "matic-network",
+        "avax": "avalanche-2",
+        "bnb": "binancecoin",
+        "trx": "tron",
+    }
+
+    _session: requests.Session = None
+
+    def __init__(
+        self, coingecko_api_key: str = COINGECKO_API_KEY, session: requests.Session = None
+    ) -> None:
             self.coingecko_api_url: str = "https://api.coingecko.com/api/v3"
             self.coingecko_api_key: str = coingecko_api_key
+            self.session: requests.Session = session or self.default_session()
+
+    @classmethod
+    def coin_id(cls, symbol: str) -> str:
+        """Coingecko id of a Foxbit currency symbol; ids pass through unchanged."""
+        return cls.SYMBOL_IDS.get(symbol.lower(), symbol)
+
+    @classmethod
+    def default_session(cls) -> requests.Session:
+        """Session shared by every instance, cached on disk unless HTTP_CACHE_ENABLED is off."""
+        if cls._session is None:
+            cls._session = (
+                build_cached_session(HTTP_CACHE_DIR, cls.CACHE_TTLS)
+                if HTTP_CACHE_ENABLED else requests.Session()
+            )
+        return cls._session
+
+    @classmethod
+    def reset_session(cls) -> None:
+        """Drops the shared session and its connection pool; the next client builds a new one."""
+        if cls._session is not None:
+            cls._session.close()
+            cls._session = None
+
+    def get(self, url: str, **kwargs) -> Response:
+        return http.request("GET", url, session=self.session, **kwargs)
 
     @log.function_log()
     def auth(self) -> int:
@@ -22,7 +83,7 @@ class Coingecko:
             "accept": "application/json", "x-cg-api-key": self.coingecko_api_key
         }
 
-        response = requests.get(url=f"{self.coingecko_api_url}/ping", headers=headers)
+        response = self.get(url=f"{self.coingecko_api_url}/ping", headers=headers)
 
         if response.status_code == 200:
             return response.status_code
@@ -36,7 +97,7 @@ class Coingecko:
             "accept": "application/json", "x-cg-api-key": self.coingecko_api_key
         }
 
-        response: Response = requests.get(
+        response: Response = self.get(
             url=f"{self.coingecko_api_url}/coins/list", headers=headers
         )
 
@@ -47,7 +108,7 @@ class Coingecko:
             "accept": "application/json", "x-cg-api-key": self.coingecko_api_key
         }
 
-        response: Response = requests.get(
+        response: Response = self.get(
             url=f"{self.coingecko_api_url}/coins/{coind_id}", headers=headers
         )
 
@@ -65,14 +126,14 @@ class Coingecko:
 
     @log.function_log()
     def coin_current_price_for_btc_usd_brl(self, coind_id: str) -> None | dict:
-        coin_data = self.coin_data_by_id(coind_id=coind_id)
+        prices = self.simple_price(coin_ids=[coind_id], vs_currencies=["btc", "usd", "brl"])
 
-        if not coin_data:
+        if not prices or coind_id not in prices:
             return
-        
-        btc: int = coin_data["market_data"]["current_price"]["btc"]
-        usd: int = coin_data["market_data"]["current_price"]["usd"]
-        brl: int = coin_data["market_data"]["current_price"]["brl"]
+
+        btc: int = prices[coind_id]["btc"]
+        usd: int = prices[coind_id]["usd"]
+        brl: int = prices[coind_id]["brl"]
 
         log.info(f"btc: {btc}, usd: {usd}, brl: {brl}")
 
@@ -80,6 +141,109 @@ class Coingecko:
             "btc": btc, "usd": usd, "brl": brl
         }
 
+    def chunk_ids(
+        self, url: str, coin_ids: list, params: dict, max_url_length: int = 2000
+    ) -> list:
+        """Splits coin ids into groups whose request URL fits in max_url_length."""
+        base_length = len(f"{url}?{urlencode({**params, 'ids': ''})}")
+        chunks: list = []
+        chunk: list = []
+        length = base_length
+
+        for coin_id in coin_ids:
+            # Each id costs its encoded length plus an encoded comma ("%2C").
+            cost = len(urlencode({"": coin_id})) - 1 + 3
+
+            if chunk and length + cost > max_url_length:
+                chunks.append(chunk)
+                chunk, length = [], base_length
+
+            chunk.append(coin_id)
+            length += cost
+
+        if chunk:
+            chunks.append(chunk)
+
+        return chunks
+
+    def simple_price(
+        self, coin_ids: list, vs_currencies: list = ("usd", "brl"),
+        max_url_length: int = 2000
+    ) -> dict:
+        """
+        Current prices of many coins in as few /simple/price requests as the
+        URL limit allows, as a compact {coin_id: {currency: price}} table.
+        """
+        url = f"{self.coingecko_api_url}/simple/price"
+
+        headers: dict = {
+            "accept": "application/json", "x-cg-api-key": self.coingecko_api_key
+        }
+
+        params: dict = {"vs_currencies": ",".join(vs_currencies)}
+
+        prices: dict = {}
+
+        unique_ids = list(dict.fromkeys(coin_id.strip().lower() for coin_id in coin_ids))
+
+        for chunk in self.chunk_ids(url, unique_ids, params, max_url_length):
+            response: Response = self.get(
+                url, headers=headers, params={**params, "ids": ",".join(chunk)}
+            )
+
+            if int(str(response.status_code)[0]) != 2:
+                log.error(f"[simple_price] {response.status_code}: {response.text}")
+                continue
+
+            prices.update(response.json())
+
+        return prices
+
+    def coins_markets(
+        self, coin_ids: list, vs_currency: str = "brl", max_url_length: int = 2000
+    ) -> dict:
+        """
+        Price, volume and 24h change of many coins from /coins/markets,
+        as a compact {coin_id: {...}} table.
+        """
+        url = f"{self.coingecko_api_url}/coins/markets"
+
+        headers: dict = {
+            "accept": "application/json", "x-cg-api-key": self.coingecko_api_key
+        }
+
+        params: dict = {"vs_currency": vs_currency, "per_page": 250}
+
+        markets: dict = {}
+
+        unique_ids = list(dict.fromkeys(coin_id.strip().lower() for coin_id in coin_ids))
+
+        for chunk in self.chunk_ids(url, unique_ids, params, max_url_length):
+            for page in range(1, len(chunk) // 250 + 2):
+                response: Response = self.get(
+                    url, headers=headers,
+                    params={**params, "ids": ",".join(chunk), "page": page}
+                )
+
+                if int(str(response.status_code)[0]) != 2:
+                    log.error(f"[coins_markets] {response.status_code}: {response.text}")
+                    break
+
+                rows = response.json()
+
+                for row in rows:
+                    markets[row["id"]] = {
+                        "current_price": row["current_price"],
+                        "total_volume": row["total_volume"],
+                        "price_change_percentage_24h": row["price_change_percentage_24h"],
+                        "last_updated": row["last_updated"]
+                    }
+
+                if len(rows) < params["per_page"]:
+                    break
+
+        return markets
+
     @log.function_log()
     def get_token_info(self) -> dict:
         token_id: str = ""
@@ -87,16 +251,36 @@ class Coingecko:
 
         headers: dict = {"accept": "application/json"}
 
-        response: Response = requests.get(url, headers=headers)
+        response: Response = self.get(url, headers=headers)
 
         return response.json()
 
     @log.function_log()
-    def get_crypto_history(self, crypto: str=None, days: int=365) -> dict | None:
+    def get_crypto_history(self, crypto: str=None, days: int=365, save_csv: bool=True) -> pd.DataFrame | None:
 
         if not crypto:
             return
-        
+
+        arrays = self.crypto_history_arrays(crypto, days)
+
+        if arrays is None:
+            return None
+
+        df = self.history_frame(*arrays)
+
+        if save_csv:
+            output_path = "/".join([os.getcwd(), f"{crypto}.csv"])
+
+            df.to_csv(output_path, index=False)
+
+        return df
+
+    def crypto_history_arrays(self, crypto: str, days: int = 365) -> tuple | None:
+        """
+        Daily history as (timestamps in ms, prices) NumPy arrays, without
+        building a DataFrame or writing a CSV. Used by AsyncCoingecko on
+        worker threads and by get_crypto_history.
+        """
         url = f"{self.coingecko_api_url}/coins/{crypto}/market_chart"
 
         headers: dict = {"accept": "application/json"}
@@ -106,28 +290,26 @@ class Coingecko:
             "days": days,
             "interval": "daily"
         }
-        
-        response: Response = requests.get(url, headers=headers, params=params)
-
-        if response.status_code == 200:
-            data = response.json()
-            prices = data['prices']
-            
-            df = pd.DataFrame(prices, columns=['timestamp', 'price'])
-            
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-            
-            df = df[['timestamp', 'datetime', 'price']]
 
-            output_path = "/".join([os.getcwd(), f"{crypto}.csv"])
+        response: Response = self.get(url, headers=headers, params=params)
 
-            df.to_csv(output_path, index=False)
-            
-            return df
-        else:
-            print(f"Erro na requisição: {response.status_code}")
+        if response.status_code != 200:
+            log.error(f"[crypto_history_arrays] {crypto} {response.status_code}: {response.text}")
             return None
 
+        prices = np.asarray(response.json()["prices"], dtype=float).reshape(-1, 2)
+
+        return prices[:, 0].astype("int64"), prices[:, 1]
+
+    @staticmethod
+    def history_frame(timestamps: np.ndarray, prices: np.ndarray) -> pd.DataFrame:
+        """Arrays from crypto_history_arrays shaped like get_crypto_history's DataFrame."""
+        df = pd.DataFrame({"timestamp": timestamps, "price": prices})
+
+        df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
+
+        return df[["timestamp", "datetime", "price"]]
+
 
 if __name__ == "__main__":
     coingecko: object = Coingecko(
@@ -146,3 +328,5 @@ if __name__ == "__main__":
     # print(coingecko.coin_data_by_id(coind_id="bitcoin"))
     # print(coingecko.coin_market_data(coind_id="bitcoin"))
     # coingecko.coin_current_price_for_btc_usd_brl(coind_id="bitcoin")
+    # print(coingecko.simple_price(coin_ids=["bitcoin", "ethereum", "solana"]))
+    # print(coingecko.coins_markets(coin_ids=["bitcoin", "ethereum", "solana"]))
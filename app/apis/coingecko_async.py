@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+from typing import AsyncIterator
+
+from infra import log
+from .coingecko import Coingecko
+
+
+class AsyncCoingecko:
+    """
+    Concurrent Coingecko history fetches for use inside the asyncio loop.
+
+    Each request, together with its JSON decoding into NumPy arrays, runs on
+    a worker thread through the regular Coingecko client, so it keeps the
+    disk cache, timeouts and circuit breakers. A semaphore bounds how many
+    requests are in flight at once.
+    """
+
+    def __init__(self, coingecko: Coingecko = None, concurrency: int = 4) -> None:
+        self.coingecko: Coingecko = coingecko or Coingecko()
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def history(self, crypto: str, days: int = 365) -> tuple:
+        """Returns (crypto, (timestamps, prices) or None)."""
+        async with self.semaphore:
+            try:
+                arrays = await asyncio.to_thread(
+                    self.coingecko.crypto_history_arrays, crypto, days
+                )
+            except Exception as error:
+                log.error(f"[AsyncCoingecko] {crypto} history failed: {error}")
+                arrays = None
+
+        return crypto, arrays
+
+    async def histories(self, cryptos: list, days: int = 365) -> AsyncIterator[tuple]:
+        """Yields (crypto, arrays) pairs in completion order."""
+        tasks = [asyncio.ensure_future(self.history(crypto, days)) for crypto in cryptos]
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def history_frames(
+        self, cryptos: list, days: int = 365, csv_directory: str = None
+    ) -> AsyncIterator[tuple]:
+        """
+        Like `histories`, with the arrays turned into get_crypto_history-shaped
+        DataFrames. With `csv_directory`, each one is also written to
+        `{crypto}.csv` there on a worker thread instead of the event loop.
+        """
+        async for crypto, arrays in self.histories(cryptos, days):
+            df = Coingecko.history_frame(*arrays) if arrays else None
+
+            if df is not None and csv_directory:
+                await asyncio.to_thread(
+                    df.to_csv, os.path.join(csv_directory, f"{crypto}.csv"), index=False
+                )
+
+            yield crypto, df
+
+
+if __name__ == "__main__":
+    async def demo():
+        client = AsyncCoingecko()
+        async for crypto, df in client.history_frames(["bitcoin", "ethereum", "solana"]):
+            print(crypto, None if df is None else df.tail(1))
+
+    asyncio.run(demo())
@@ -8,6 +8,7 @@ import hashlib
 from urllib.parse import urlencode
 
 from infra import log
+from .resilience import http
 
 
 class Foxbit:
@@ -55,7 +56,11 @@ class Foxbit:
         }
 
         try:
-            response = requests.request(method, url, params=params, json=body, headers=headers)
+            # Orders carrying a client_order_id are deduplicated by Foxbit, so they can be retried.
+            response = http.request(
+                method, url, params=params, json=body, headers=headers,
+                idempotent=method.upper() == "GET" or bool(body and body.get("client_order_id"))
+            )
             response.raise_for_status()
             return response.json()
         except requests.HTTPError as http_err:
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator
+
+import websockets
+
+from infra import log
+
+
+class FoxbitPriceStream:
+    """Foxbit public WebSocket ticker feed.
+
+    Iterating the stream yields `(base_currency, price, timestamp)` tuples for
+    every ticker update of the subscribed markets, reconnecting with
+    exponential backoff whenever the socket drops.
+    """
+
+    def __init__(
+        self, url: str = "wss://api.foxbit.com.br/ws/v3/public",
+        market_symbols: list = None, quote_currency: str = "brl"
+    ) -> None:
+        self.url: str = url
+        self.market_symbols: list = market_symbols or []
+        self.quote_currency: str = quote_currency
+
+    def subscribe_message(self) -> str:
+        return json.dumps({
+            "type": "subscribe",
+            "params": [
+                {"channel": "ticker", "market_symbol": market_symbol}
+                for market_symbol in self.market_symbols
+            ]
+        })
+
+    def parse_message(self, raw: str | bytes) -> tuple | None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return None
+
+        data = message.get("data")
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if not isinstance(data, dict):
+            return None
+
+        market_symbol = data.get("market_symbol") or message.get("params", {}).get("market_symbol")
+        price = (data.get("last_trade") or {}).get("price", data.get("price"))
+
+        if not market_symbol or price is None:
+            return None
+
+        base_currency = market_symbol.lower().removesuffix(self.quote_currency)
+
+        return base_currency, float(price), time.time()
+
+    async def __aiter__(self) -> AsyncIterator[tuple]:
+        backoff: float = 1.0
+
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=20) as socket:
+                    await socket.send(self.subscribe_message())
+                    log.info(f"[FoxbitPriceStream] subscribed to {len(self.market_symbols)} markets")
+                    backoff = 1.0
+
+                    async for raw in socket:
+                        event = self.parse_message(raw)
+                        if event:
+                            yield event
+            except (OSError, websockets.WebSocketException) as error:
+                log.error(f"[FoxbitPriceStream] connection lost: {error}, retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+
+class LocalPriceFeed:
+    """Local WebSocket stand-in for the Foxbit ticker feed.
+
+    Serves the same message shape as the exchange, so `FoxbitPriceStream`
+    can be pointed at `ws://host:port` in tests and dry runs and driven with
+    `publish`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.clients: set = set()
+        self.server: Any = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def handler(self, socket: Any) -> None:
+        self.clients.add(socket)
+        try:
+            async for _ in socket:
+                pass
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(socket)
+
+    async def start(self) -> None:
+        self.server = await websockets.serve(self.handler, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def publish(self, market_symbol: str, price: float) -> None:
+        message = json.dumps({
+            "type": "message",
+            "params": {"channel": "ticker", "market_symbol": market_symbol},
+            "data": {"market_symbol": market_symbol, "last_trade": {"price": str(price)}}
+        })
+
+        for socket in list(self.clients):
+            try:
+                await socket.send(message)
+            except websockets.ConnectionClosed:
+                self.clients.discard(socket)
+
+
+if __name__ == "__main__":
+    async def demo():
+        feed = LocalPriceFeed()
+        await feed.start()
+
+        stream = FoxbitPriceStream(url=feed.url, market_symbols=["btcbrl"])
+
+        async def produce():
+            await asyncio.sleep(1)
+            for price in (350000.0, 351000.0, 349500.0):
+                await feed.publish("btcbrl", price)
+                await asyncio.sleep(0.5)
+
+        producer = asyncio.create_task(produce())
+
+        async for event in stream:
+            print(event)
+            if producer.done():
+                break
+
+        await feed.stop()
+
+    asyncio.run(demo())
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from urllib.parse import urlparse
+
+import requests
+from requests.models import Response
+
+from infra import (
+    log, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES,
+    HTTP_BREAKER_FAILURES, HTTP_BREAKER_RESET_SECONDS
+)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without touching the network while a host's breaker is open."""
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when the current deadline leaves no time for another attempt."""
+
+
+_deadline: ContextVar = ContextVar("http_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Bounds the total time spent in HTTP calls made inside the block,
+    retries and backoff included. Propagates into `asyncio.to_thread`.
+    """
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half_open after `reset_timeout` seconds, letting one trial call
+    through; the trial closes the breaker on success or reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.state: str = "closed"
+        self.failures: int = 0
+        self.opened_at: float = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class LatencyStats:
+    """Call counts and a rolling window of latencies for one host."""
+
+    def __init__(self, window: int = 256) -> None:
+        self.calls: int = 0
+        self.failures: int = 0
+        self.rejected: int = 0
+        self.latencies: deque = deque(maxlen=window)
+
+    def record(self, latency: float, failed: bool) -> None:
+        self.calls += 1
+        self.failures += int(failed)
+        self.latencies.append(latency)
+
+    def percentile(self, fraction: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class ResilientHttp:
+    """
+    Shared entry point for the HTTP calls of every API client: connect/read
+    timeouts, bounded retries with full-jitter exponential backoff, the
+    per-tick deadline and a circuit breaker per host.
+    """
+
+    RETRY_STATUSES: tuple = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+        max_retries: int = 2, backoff_base: float = 0.5, backoff_max: float = 8.0,
+        failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        self.connect_timeout: float = connect_timeout
+        self.read_timeout: float = read_timeout
+        self.max_retries: int = max_retries
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.breakers: dict = {}
+        self.stats: dict = {}
+        self.lock = threading.Lock()
+
+    def host_state(self, host: str) -> tuple:
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self.stats[host] = LatencyStats()
+            return self.breakers[host], self.stats[host]
+
+    @staticmethod
+    def remaining() -> float | None:
+        expires_at = _deadline.get()
+        return None if expires_at is None else expires_at - time.monotonic()
+
+    def request(
+        self, method: str, url: str, session: requests.Session = None,
+        idempotent: bool = None, **kwargs
+    ) -> Response:
+        """
+        Performs the request and returns the last response. Connection
+        errors and timeouts are raised once retries are exhausted; only
+        idempotent calls (GET by default) are retried.
+        """
+        host = urlparse(url).netloc
+        breaker, stats = self.host_state(host)
+        idempotent = method.upper() == "GET" if idempotent is None else idempotent
+        attempts = self.max_retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            if not breaker.allow():
+                stats.rejected += 1
+                raise CircuitOpenError(f"circuit open for {host}")
+
+            remaining = self.remaining()
+            if remaining is not None and remaining <= 0:
+                raise DeadlineExceeded(f"deadline exceeded before calling {host}")
+
+            read_timeout = self.read_timeout if remaining is None else min(self.read_timeout, remaining)
+
+            started = time.monotonic()
+            try:
+                response = (session or requests).request(
+                    method, url, timeout=(self.connect_timeout, read_timeout), **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as error:
+                stats.record(time.monotonic() - started, failed=True)
+                breaker.record_failure()
+
+                if attempt == attempts - 1:
+                    raise
+                log.warn(f"[http] {method} {host} failed ({error}), retrying")
+            except Exception:
+                # Not retried, but still settles the breaker (a half-open trial included).
+                stats.record(time.monotonic() - started, failed=True)
+                breaker.record_failure()
+                raise
+            else:
+                failed = response.status_code in self.RETRY_STATUSES
+                stats.record(time.monotonic() - started, failed=failed)
+
+                if not failed:
+                    breaker.record_success()
+                    return response
+
+                breaker.record_failure()
+
+                if attempt == attempts - 1:
+                    return response
+                log.warn(f"[http] {method} {host} returned {response.status_code}, retrying")
+
+            self.backoff(attempt)
+
+    def backoff(self, attempt: int) -> None:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+        remaining = self.remaining()
+        if remaining is not None:
+            delay = min(delay, max(remaining, 0))
+
+        time.sleep(delay)
+
+    def snapshot(self) -> dict:
+        """Breaker state and latency stats per host."""
+        with self.lock:
+            hosts = list(self.breakers.keys())
+
+        snapshot = {}
+        for host in hosts:
+            breaker, stats = self.breakers[host], self.stats[host]
+            snapshot[host] = {
+                "state": breaker.state,
+                "consecutive_failures": breaker.failures,
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "rejected": stats.rejected,
+                "p50_ms": None if stats.percentile(0.5) is None else round(stats.percentile(0.5) * 1000, 1),
+                "p95_ms": None if stats.percentile(0.95) is None else round(stats.percentile(0.95) * 1000, 1),
+            }
+
+        return snapshot
+
+
+http = ResilientHttp(
+    connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=HTTP_READ_TIMEOUT,
+    max_retries=HTTP_MAX_RETRIES, failure_threshold=HTTP_BREAKER_FAILURES,
+    reset_timeout=HTTP_BREAKER_RESET_SECONDS
+)
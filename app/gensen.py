@@ -1,20 +1,392 @@
 # -*- coding: utf-8 -*-
 
 import datetime
+import os
+import time
 import pytz
 import asyncio
+import requests
+from contextlib import nullcontext
 from pathlib import Path
 
-from infra import log, ENVIRONMENT, COINGECKO_API_KEY
-from apis import Firebase, Foxbit, Coingecko
+from infra import (
+    log, ENVIRONMENT, COINGECKO_API_KEY, SHARDING_ENABLED, SHARD_WORKER_ID,
+    SHARD_COUNT, SHARD_LEASE_BACKEND, SHARD_LEASE_PATH, SHARD_LEASE_TTL,
+    STREAMING_QUOTES, FOXBIT_WS_URL, HOLDINGS_REFRESH_SECONDS,
+    ORDER_CONCURRENCY, ORDER_RATE_PER_SECOND, ORDER_DEDUP_WINDOW,
+    PREDICTION_BACKEND, CANDLES_DIR, CANDLE_HISTORY_MIN_DAYS, PROFILE_TICKS,
+    PROFILE_MODE, PROFILE_THRESHOLD_SECONDS, PROFILE_MAX_FILES, PROFILE_DIR,
+    TickProfiler, TICK_DEADLINE_SECONDS, HISTORY_CACHE_SECONDS, SNAPSHOT_PATH,
+    SNAPSHOT_INTERVAL_SECONDS, SNAPSHOT_MAX_AGE_SECONDS, MEMORY_MONITOR,
+    MEMORY_CEILING_MB, MEMORY_SNAPSHOT_INTERVAL, MEMORY_TOP_N, MemoryMonitor,
+    ADAPTIVE_POLLING, POLL_MIN_SECONDS, POLL_MAX_SECONDS, POLL_VOLATILITY_SIGMAS
+)
+from apis import (
+    Firebase, Foxbit, Coingecko, AsyncCoingecko, FoxbitPriceStream,
+    http, deadline, CircuitOpenError, DeadlineExceeded
+)
 from predictions import PriceIndicator
+from services import (
+    ShardCoordinator, SQLiteLeaseStore, FirebaseLeaseStore, LastPriceTable,
+    OrderExecutor, CandleAggregator, WarmStateSnapshot, pack_history, unpack_history,
+    SellThresholdIndex, sell_threshold_price, AdaptivePollScheduler, daily_volatility
+)
 from utils import Encryptor
 
 
 class MarketConditionsEvaluator:
-    def __init__(self):
+    def __init__(
+        self, shard_coordinator: ShardCoordinator = None,
+        price_table: LastPriceTable = None, order_executor: OrderExecutor = None,
+        candles: CandleAggregator = None, poll_scheduler: AdaptivePollScheduler = None
+    ):
         self.current_dir = Path(__file__).resolve().parent
         self.beta_feature_cryptos: list = ["bitcoin", "ethereum", "solana"]
+        self.shard_coordinator = shard_coordinator
+        # Decaying maximum of how long the poll loop spends on one user.
+        self.user_pass_seconds: float = 60.0
+        # When set, prices come from the streaming feed and sells are event-driven.
+        self.price_table = price_table
+        self.order_executor = order_executor or OrderExecutor()
+        self.connection = None
+        self.holdings: dict = {}
+        self.threshold_index = SellThresholdIndex()
+        # Sharded workers on one host must not append to each other's candle files.
+        self.candles = candles or CandleAggregator(
+            str(Path(CANDLES_DIR) / SHARD_WORKER_ID) if SHARDING_ENABLED else CANDLES_DIR
+        )
+        self.history_cache: dict = {}
+        self.prediction_cache: dict = {}
+        # When set, polled holdings are re-quoted only as often as they could trigger.
+        # A holding that is not due skips its whole pass: balance, sell and buy checks.
+        self.poll_scheduler = poll_scheduler
+
+    def owns(self, user: str, hold_for: float = 0.0) -> bool:
+        return not self.shard_coordinator or self.shard_coordinator.owns(user, hold_for)
+
+    def submit_order(
+        self, user: str, foxbit: Foxbit, order: dict, state, on_confirmed=None, recheck=None
+    ) -> None:
+        """
+        Enqueues an order while this worker owns the user. Right before the
+        order is posted the executor checks ownership again, since the shard
+        may have moved in the meantime, and awaits `recheck(order)`, which
+        may refresh the order or return False to drop it.
+        """
+        if not self.owns(user):
+            log.warn(f"[sharding] {user} no longer owned, {order['side']} order not enqueued")
+            return
+
+        async def guard(order: dict) -> bool:
+            if not self.owns(user):
+                return False
+            return await recheck(order) if recheck else True
+
+        self.order_executor.enqueue(
+            user, foxbit, order, state=state, on_confirmed=on_confirmed, guard=guard
+        )
+
+    def candle_history(self, cryptocurrency: str):
+        """
+        Daily closes from observed quotes, or None until at least 90% of the
+        last CANDLE_HISTORY_MIN_DAYS days have a candle of their own.
+        """
+        if self.candles.coverage(cryptocurrency, "1d", CANDLE_HISTORY_MIN_DAYS) < 0.9:
+            return None
+
+        return self.candles.history_frame(cryptocurrency, "1d")
+
+    def history_stale(self, cryptocurrency: str) -> bool:
+        """Whether daily_history would have to fetch from Coingecko."""
+        if self.candle_history(cryptocurrency) is not None:
+            return False
+
+        cached = self.history_cache.get(cryptocurrency)
+
+        return not cached or time.time() - cached[0] >= HISTORY_CACHE_SECONDS
+
+    def daily_history(self, cryptocurrency: str):
+        """
+        Daily closes aggregated from observed quotes once recent days are
+        covered, falling back to the (cached) Coingecko daily history.
+        """
+        history = self.candle_history(cryptocurrency)
+
+        if history is not None:
+            return history
+
+        cached = self.history_cache.get(cryptocurrency)
+
+        if cached and time.time() - cached[0] < HISTORY_CACHE_SECONDS:
+            return cached[1].copy()
+
+        coingecko: object = Coingecko(
+            coingecko_api_key=COINGECKO_API_KEY
+        )
+
+        # Normally prefetched by refresh_histories, which also writes the CSV copy.
+        history = coingecko.get_crypto_history(
+            crypto=Coingecko.coin_id(cryptocurrency), days=365, save_csv=False
+        )
+
+        if history is not None:
+            self.history_cache[cryptocurrency] = (time.time(), history.copy())
+
+        return history
+
+    def volatility(self, cryptocurrency: str) -> float | None:
+        """
+        Daily volatility from the history already at hand (observed candles
+        or the Coingecko history refresh_histories cached under the symbol),
+        without fetching anything. None, and so the scheduler's default, for
+        symbols with neither.
+        """
+        history = self.candle_history(cryptocurrency)
+
+        if history is None:
+            cached = self.history_cache.get(cryptocurrency)
+            history = cached[1] if cached else None
+
+        if history is None or not len(history):
+            return None
+
+        return daily_volatility(history["price"].to_numpy())
+
+    def histories_needed(self, users: dict) -> set:
+        """
+        Symbols whose daily history this tick will read: beta feature holdings
+        of owned users whose prediction is due for a refit and, with adaptive
+        polling, every owned holding Coingecko knows, for its volatility.
+        """
+        needed = set()
+
+        for user, user_data in users.items():
+            if not self.owns(user):
+                continue
+
+            for exchange in user_data.get("exchanges", {}).values():
+                for cryptocurrency in (exchange.get("cryptocurrencies") or {}).keys():
+                    cached = self.prediction_cache.get(cryptocurrency)
+
+                    if cryptocurrency in self.beta_feature_cryptos and (
+                        not cached or time.time() - cached[0] >= HISTORY_CACHE_SECONDS
+                    ):
+                        needed.add(cryptocurrency)
+
+                    if self.poll_scheduler and cryptocurrency.lower() in Coingecko.SYMBOL_IDS:
+                        needed.add(cryptocurrency)
+
+        return needed
+
+    async def refresh_histories(self, cryptocurrencies: set) -> None:
+        """
+        Refills the stale Coingecko histories of the given symbols
+        concurrently, so `daily_history` finds them cached during the tick.
+        CSV copies are written off the event loop.
+        """
+        stale: dict = {}
+
+        for cryptocurrency in cryptocurrencies:
+            if self.history_stale(cryptocurrency):
+                stale.setdefault(Coingecko.coin_id(cryptocurrency), []).append(cryptocurrency)
+
+        if not stale:
+            return
+
+        client = AsyncCoingecko(Coingecko(coingecko_api_key=COINGECKO_API_KEY))
+
+        async for coin_id, history in client.history_frames(
+            list(stale.keys()), days=365, csv_directory=os.getcwd()
+        ):
+            if history is None:
+                continue
+
+            for cryptocurrency in stale[coin_id]:
+                self.history_cache[cryptocurrency] = (time.time(), history)
+
+    def predict(self, cryptocurrency: str) -> tuple:
+        """
+        PriceIndicator signals for the cryptocurrency, refitted at most once
+        per HISTORY_CACHE_SECONDS since the inputs are daily prices.
+        """
+        cached = self.prediction_cache.get(cryptocurrency)
+
+        if cached and time.time() - cached[0] < HISTORY_CACHE_SECONDS:
+            return cached[1]
+
+        crypto_history_df = self.daily_history(cryptocurrency)
+
+        predictor = PriceIndicator(crypto_history_df, backend=PREDICTION_BACKEND)
+
+        signals = tuple(
+            value if isinstance(value, str) else float(value) for value in predictor.run()
+        )
+
+        self.prediction_cache[cryptocurrency] = (time.time(), signals)
+
+        return signals
+
+    def register_caches(self, monitor: MemoryMonitor) -> None:
+        """Caches the memory monitor may drop when over its ceiling."""
+        # Lambdas, since restore_warm_state replaces these dicts.
+        monitor.register_cache("history_cache", lambda: self.history_cache.clear())
+        monitor.register_cache("prediction_cache", lambda: self.prediction_cache.clear())
+        # Open candles are flushed to disk and reopened from there on the next quote.
+        monitor.register_cache("candles", self.shed_candles)
+        monitor.register_cache("coingecko_session", Coingecko.reset_session)
+
+    def shed_candles(self) -> None:
+        with self.candles.lock:
+            self.candles.flush()
+            self.candles.series.clear()
+
+    def export_warm_state(self) -> dict:
+        """
+        State worth keeping across restarts. Holdings are left out on
+        purpose: they carry decrypted exchange credentials.
+        """
+        return {
+            "prices": dict(self.price_table.prices) if self.price_table else {},
+            "histories": {
+                cryptocurrency: [fetched_at, pack_history(history)]
+                for cryptocurrency, (fetched_at, history) in self.history_cache.items()
+            },
+            "predictions": {
+                cryptocurrency: [computed_at, list(signals)]
+                for cryptocurrency, (computed_at, signals) in self.prediction_cache.items()
+            },
+        }
+
+    def restore_warm_state(self, state: dict) -> None:
+        if self.price_table:
+            for symbol, (price, timestamp) in state.get("prices", {}).items():
+                self.price_table.update(symbol, price, timestamp)
+
+        self.history_cache = {
+            cryptocurrency: (fetched_at, unpack_history(history))
+            for cryptocurrency, (fetched_at, history) in state.get("histories", {}).items()
+            if time.time() - fetched_at < HISTORY_CACHE_SECONDS
+        }
+
+        self.prediction_cache = {
+            cryptocurrency: (computed_at, tuple(signals))
+            for cryptocurrency, (computed_at, signals) in state.get("predictions", {}).items()
+            if time.time() - computed_at < HISTORY_CACHE_SECONDS
+        }
+
+    def quote_price(self, foxbit: Foxbit, cryptocurrency: str) -> float:
+        """Current BRL price of one unit from the Foxbit quotes endpoint (blocking)."""
+        params = {
+            "side": "buy",
+            "base_currency": cryptocurrency,
+            "quote_currency": "brl",
+            "amount": "1"
+        }
+
+        quote_sell = foxbit.request(
+            "GET", "/rest/v3/markets/quotes", params=params, body=None
+        )
+
+        return float(quote_sell["price"])
+
+    def sell_check(
+        self, foxbit: Foxbit, user: str, cryptocurrency: str,
+        asset: dict, balance_available: float, price: float
+    ) -> tuple:
+        asset_available_value_brl = foxbit.convert_asset_to_brl(
+            brl_asset=float(balance_available),
+            available_balance_brl=float(price)
+        )
+
+        difference_check: float = round(
+            float(asset_available_value_brl) -
+            float(asset["base_balance"]), 4
+        )
+
+        percentage_of_profit: float = (
+            (difference_check * 100) / float(asset["base_balance"])
+        )
+
+        log.info(f"Percentage of profit: {percentage_of_profit:.1f}%")
+
+        log.info(f"{difference_check}: {cryptocurrency} -> {user}")
+
+        triggered: bool = (
+            percentage_of_profit >= 10.0 and
+            float(asset_available_value_brl) >=
+            float(asset["base_balance"]) + (float(asset["fixed_profit_brl"]) + 0.3)
+        )
+
+        return asset_available_value_brl, difference_check, triggered
+
+    def execute_sell(
+        self, connection, foxbit: Foxbit, user: str, cryptocurrency: str,
+        asset: dict, asset_available_value_brl: float, difference_check: float,
+        balance_available: float
+    ) -> None:
+        async def notify(order: dict = None, confirmation: dict = None) -> None:
+            await asyncio.to_thread(
+                self.notify_sale, connection, user, cryptocurrency, asset,
+                asset_available_value_brl, difference_check
+            )
+
+        async def recheck(order: dict) -> bool:
+            """
+            Re-runs the sell rule on a fresh price just before posting, since
+            the order may have waited in the queue, and resizes the order to it.
+            """
+            price = self.price_table.get(cryptocurrency) if self.price_table else None
+
+            if price is None:
+                price = await asyncio.to_thread(self.quote_price, foxbit, cryptocurrency)
+
+            value_brl, _, triggered = self.sell_check(
+                foxbit, user, cryptocurrency, asset, balance_available, price
+            )
+
+            if triggered:
+                order["amount"] = str(float(value_brl - 5.3))
+            else:
+                log.warn(f"[OrderExecutor] {cryptocurrency} -> {user} no longer meets the sell rule at {price}")
+
+            return triggered
+
+        if ENVIRONMENT == "SERVER":
+            order = {
+                "market_symbol": f"{cryptocurrency}brl",
+                "side": "SELL",
+                "type": "INSTANT",
+                "amount": str(float(asset_available_value_brl - 5.3))
+            }
+
+            self.submit_order(
+                user, foxbit, order, state=(float(asset["base_balance"]), float(balance_available)),
+                on_confirmed=notify, recheck=recheck
+            )
+        else:
+            self.notify_sale(
+                connection, user, cryptocurrency, asset,
+                asset_available_value_brl, difference_check
+            )
+
+    def notify_sale(
+        self, connection, user: str, cryptocurrency: str, asset: dict,
+        asset_available_value_brl: float, difference_check: float
+    ) -> None:
+        log.info(f"[INSTANT ORDER NOTIFICATION] {cryptocurrency} -> {user}")
+
+        name_timestamp = str(
+            datetime.datetime.now(
+                pytz.timezone("America/Sao_Paulo")
+        ).strftime("%Y%m%d%H%M%S")
+        )
+
+        connection.child(f"users/{user}/messages/gensen/{name_timestamp}").set(
+            {
+                "title": f'Short-term profit of {cryptocurrency.upper()} (+**{difference_check:.2f}**)!',
+                "description": f"At this very moment I made a **sale** of R$**{float(asset_available_value_brl - 5.3):.2f}** worth of {asset['name']}!!"
+            }
+        )
 
     async def evaluate_market_conditions(self):
         log.info(f"[background_tasks] market_conditions_evaluator: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -23,12 +395,157 @@ class MarketConditionsEvaluator:
 
         connection = firebase.firebase_connection("root")
 
-        users = connection.child("users").get()
+        users = await asyncio.to_thread(connection.child("users").get)
 
         if not users:
             return
 
+        # Every blocking call of the pass runs on a worker thread, so the price
+        # stream and the order executor keep running while it is in progress.
+        if self.shard_coordinator:
+            await asyncio.to_thread(self.shard_coordinator.rebalance)
+
+        await self.refresh_histories(self.histories_needed(users))
+
+        for user in users.keys():
+            # Hold the lease for as long as a pass over one user has recently taken.
+            if not self.owns(user, hold_for=self.user_pass_seconds):
+                continue
+
+            user_started_at = time.monotonic()
+
+            try:
+                await self.evaluate_user(connection, user, users[user])
+            except (CircuitOpenError, DeadlineExceeded):
+                raise
+            except requests.RequestException as error:
+                # One user's upstream failure must not abort the tick for everyone else.
+                log.error(f"[UPSTREAM ERROR] {user}: {error}")
+
+            self.user_pass_seconds = max(
+                time.monotonic() - user_started_at, self.user_pass_seconds * 0.9
+            )
+
+        self.candles.flush()
+
+        if self.poll_scheduler:
+            log.info(f"[poll_scheduler] {self.poll_scheduler.stats()}")
+
+    async def evaluate_user(self, connection, user: str, user_data: dict) -> None:
+        user_credentials = await asyncio.to_thread(
+            connection.child(f"users/{user}/exchanges/foxbit/credentials").get
+        )
+
+        if not user_credentials:
+            return
+
+        due: list = [
+            (exchange, cryptocurrency, asset)
+            for exchange, exchange_data in user_data["exchanges"].items()
+            if "cryptocurrencies" in exchange_data.keys()
+            for cryptocurrency, asset in exchange_data["cryptocurrencies"].items()
+            if not self.poll_scheduler or self.poll_scheduler.due(f"{user}/{exchange}/{cryptocurrency}")
+        ]
+
+        if not due:
+            return
+
+        foxbit = Foxbit(
+            api_key=Encryptor().decrypt_api_key(user_credentials["FOXBIT_ACCESS_KEY"]),
+            api_secret=Encryptor().decrypt_api_key(user_credentials["FOXBIT_SECRET_KEY"])
+        )
+
+        # One accounts request per user, shared by all of the user's assets.
+        accounts = await asyncio.to_thread(foxbit.request, "GET", "/rest/v3/accounts", None, None)
+
+        if not accounts:
+            return
+
+        balances: dict = {
+            account["currency_symbol"]: account["balance_available"]
+            for account in accounts["data"]
+        }
+
+        for exchange, cryptocurrency, asset in due:
+            if cryptocurrency not in balances:
+                continue
+
+            key = f"{user}/{exchange}/{cryptocurrency}"
+            balance_available = balances[cryptocurrency]
+
+            price = self.price_table.get(cryptocurrency) if self.price_table else None
+
+            # Streamed prices are sold on by on_price; REST quotes are sold on here,
+            # which keeps sells going while the WebSocket is down or stale.
+            streamed: bool = price is not None
+
+            if price is None:
+                price = await asyncio.to_thread(self.quote_price, foxbit, cryptocurrency)
+
+            self.candles.update(cryptocurrency, price)
+
+            # Polled holdings are checked one by one; the threshold index only
+            # drives the streaming path (see SellThresholdIndex).
+            asset_available_value_brl, difference_check, triggered = self.sell_check(
+                foxbit, user, cryptocurrency, asset, balance_available, price
+            )
+
+            if self.poll_scheduler:
+                self.poll_scheduler.schedule(
+                    key, price,
+                    sell_threshold_price(
+                        float(asset["base_balance"]), float(asset["fixed_profit_brl"]),
+                        float(balance_available)
+                    ),
+                    self.volatility(cryptocurrency)
+                )
+
+            if triggered:
+                if not streamed:
+                    self.execute_sell(
+                        connection, foxbit, user, cryptocurrency, asset,
+                        asset_available_value_brl, difference_check, balance_available
+                    )
+            elif float(asset_available_value_brl) < 10.0 and cryptocurrency in self.beta_feature_cryptos:
+                percent_difference, status, double_percent_difference, double_status, prediction_difference, prediction_status = (
+                    await asyncio.to_thread(self.predict, cryptocurrency)
+                )
+
+                if status == "below" and double_status == "below" and prediction_status == "below":
+                    if percent_difference <= -5.0 and double_percent_difference <= -5.0 and prediction_difference <= -5.0:
+                        order = {
+                            "market_symbol": f"{cryptocurrency}brl",
+                            "side": "BUY",
+                            "type": "INSTANT",
+                            "amount": str(asset["base_balance"])
+                        }
+
+                        self.submit_order(
+                            user, foxbit, order,
+                            state=(float(asset["base_balance"]), float(balance_available))
+                        )
+
+    def refresh_holdings(self) -> None:
+        """
+        Rebuilds the holdings book used by the streaming pipeline, with one
+        accounts request per user instead of one per asset, and brings the
+        sell threshold index up to date with the new balances.
+        """
+        connection = Firebase().firebase_connection("root")
+
+        users = connection.child("users").get() or {}
+
+        # Runs on a worker thread, possibly mid-user for the poll loop, which
+        # is the only place shards are released.
+        if self.shard_coordinator:
+            self.shard_coordinator.renew()
+
+        holdings: dict = {}
+
         for user in users.keys():
+            if not self.owns(user):
+                continue
+
             user_credentials = connection.child(
                 f"users/{user}/exchanges/foxbit/credentials"
             ).get()
@@ -36,128 +553,179 @@ class MarketConditionsEvaluator:
             if not user_credentials:
                 continue
 
+            foxbit = Foxbit(
+                api_key=Encryptor().decrypt_api_key(user_credentials["FOXBIT_ACCESS_KEY"]),
+                api_secret=Encryptor().decrypt_api_key(user_credentials["FOXBIT_SECRET_KEY"])
+            )
+
+            accounts = foxbit.request("GET", "/rest/v3/accounts", None, None)
+
+            if not accounts:
+                continue
+
+            balances: dict = {
+                account["currency_symbol"]: account["balance_available"]
+                for account in accounts["data"]
+            }
+
             for exchange in users[user]["exchanges"].keys():
                 if not "cryptocurrencies" in users[user]["exchanges"][exchange].keys():
                     continue
 
-                for cryptocurrency in users[user]["exchanges"][exchange]["cryptocurrencies"].keys():
-                    asset = users[user]["exchanges"][exchange]["cryptocurrencies"][cryptocurrency]
+                for cryptocurrency, asset in users[user]["exchanges"][exchange]["cryptocurrencies"].items():
+                    if cryptocurrency not in balances:
+                        continue
+
+                    key = f"{user}/{exchange}/{cryptocurrency}"
+
+                    holdings[key] = {
+                        "user": user,
+                        "cryptocurrency": cryptocurrency,
+                        "asset": asset,
+                        "foxbit": foxbit,
+                        "balance_available": balances[cryptocurrency]
+                    }
 
-                    foxbit = Foxbit(
-                        api_key=Encryptor().decrypt_api_key(user_credentials["FOXBIT_ACCESS_KEY"]),
-                        api_secret=Encryptor().decrypt_api_key(user_credentials["FOXBIT_SECRET_KEY"])
+                    self.threshold_index.update(
+                        cryptocurrency, key, asset["base_balance"],
+                        asset["fixed_profit_brl"], balances[cryptocurrency]
                     )
 
-                    accounts = foxbit.request("GET", "/rest/v3/accounts", None, None)
-
-                    for account in accounts["data"]:
-                        if account["currency_symbol"] == cryptocurrency:
-                            params = {
-                                "side": "buy",
-                                "base_currency": cryptocurrency,
-                                "quote_currency": "brl",
-                                "amount": "1"
-                            }
-
-                            quote_sell = foxbit.request(
-                                "GET", "/rest/v3/markets/quotes", params=params, body=None
-                            )
-
-                            asset_available_value_brl = foxbit.convert_asset_to_brl(
-                                brl_asset=float(account["balance_available"]),
-                                available_balance_brl=float(quote_sell["price"])
-                            )
-
-                            difference_check: float = round(
-                                float(asset_available_value_brl) -
-                                float(asset["base_balance"]), 4
-                            )
-                            
-                            percentage_of_profit: float = (
-                                (difference_check * 100) / float(asset["base_balance"])
-                            )
-
-                            log.info(f"Percentage of profit: {percentage_of_profit:.1f}%")
-
-                            log.info(f"{difference_check}: {cryptocurrency} -> {user}")
-
-                            if (
-                                percentage_of_profit >= 10.0 and
-                                float(asset_available_value_brl) >=
-                                float(asset["base_balance"]) + (float(asset["fixed_profit_brl"]) + 0.3)
-                            ):
-                                timestamp = datetime.datetime.now(
-                                    pytz.timezone("America/Sao_Paulo")
-                                ).strftime("%Y-%m-%d %H:%M:%S")
-
-                                if ENVIRONMENT == "SERVER":
-                                    order = {
-                                        "market_symbol": f"{cryptocurrency}brl",
-                                        "side": "SELL",
-                                        "type": "INSTANT",
-                                        "amount": str(float(asset_available_value_brl - 5.3))
-                                    }
-
-                                    order_response = foxbit.request("POST", "/rest/v3/orders", None, body=order)
-
-                                    log.info(f"[{timestamp}] SELL ORDER: {order}")
-                                    log.info(f"[{timestamp}] ORDER RESPONSE: {order_response}")
-
-                                    await asyncio.sleep(1)
-
-                                log.info(f"[INSTANT ORDER NOTIFICATION] {cryptocurrency} -> {user}")
-
-                                firebase = Firebase()
-
-                                name_timestamp = str(
-                                    datetime.datetime.now(
-                                        pytz.timezone("America/Sao_Paulo")
-                                ).strftime("%Y%m%d%H%M%S")
-                                )
-
-                                connection.child(f"users/{user}/messages/gensen/{name_timestamp}").set(
-                                    {
-                                        "title": f'Short-term profit of {cryptocurrency.upper()} (+**{difference_check:.2f}**)!',
-                                        "description": f"At this very moment I made a **sale** of R$**{float(asset_available_value_brl - 5.3):.2f}** worth of {asset['name']}!!"
-                                    }
-                                )
-                            elif float(asset_available_value_brl) < 10.0 and cryptocurrency in self.beta_feature_cryptos:
-                                coingecko: object = Coingecko(
-                                    coingecko_api_key=COINGECKO_API_KEY
-                                )
-
-                                crypto_history_df = coingecko.get_crypto_history(
-                                    crypto=cryptocurrency, days=365
-                                )
-
-                                predictor = PriceIndicator(crypto_history_df)
-
-                                percent_difference, status, double_percent_difference, double_status, prediction_difference, prediction_status = (
-                                    predictor.run()
-                                )
-
-                                if status == "below" and double_status == "below" and prediction_status == "below":
-                                    if percent_difference <= -5.0 and double_percent_difference <= -5.0 and prediction_difference <= -5.0:
-                                        order = {
-                                            "market_symbol": f"{cryptocurrency}brl",
-                                            "side": "BUY",
-                                            "type": "INSTANT",
-                                            "amount": str(asset["base_balance"])
-                                        }
-
-                                        order_response = foxbit.request("POST", "/rest/v3/orders", None, body=order)
-
-                                        log.info(f"[{timestamp}] BUY ORDER: {order}")
-                                        log.info(f"[{timestamp}] ORDER RESPONSE: {order_response}")
-
-                                        await asyncio.sleep(1)
+        for key in self.holdings.keys() - holdings.keys():
+            self.threshold_index.remove(key)
+
+        self.connection = connection
+        self.holdings = holdings
+
+        log.info(f"[holdings] {len(holdings)} holdings in {len(self.threshold_index.symbols())} symbols")
+
+    async def on_price(self, cryptocurrency: str, price: float) -> None:
+        """
+        Runs the profit check only for the holdings of the symbol that just
+        moved whose threshold price the new price has reached.
+        """
+        for key in self.threshold_index.triggered(cryptocurrency, price):
+            holding = self.holdings[key]
+
+            if not self.owns(holding["user"]):
+                continue
+
+            asset_available_value_brl, difference_check, triggered = self.sell_check(
+                holding["foxbit"], holding["user"], cryptocurrency,
+                holding["asset"], holding["balance_available"], price
+            )
+
+            if not triggered:
+                continue
+
+            # The balance is gone after the sale; drop it until the next refresh.
+            self.threshold_index.remove(key)
+
+            self.execute_sell(
+                self.connection, holding["foxbit"], holding["user"], cryptocurrency,
+                holding["asset"], asset_available_value_brl, difference_check,
+                holding["balance_available"]
+            )
+
+    async def consume_price_stream(self, stream: FoxbitPriceStream) -> None:
+        async for cryptocurrency, price, timestamp in stream:
+            self.candles.update(cryptocurrency, price, timestamp)
+
+            if self.price_table.update(cryptocurrency, price, timestamp):
+                await self.on_price(cryptocurrency, price)
+
+
+def build_shard_coordinator() -> ShardCoordinator | None:
+    if not SHARDING_ENABLED:
+        return None
+
+    if SHARD_LEASE_BACKEND == "firebase":
+        store = FirebaseLeaseStore(Firebase().firebase_connection("root"))
+    else:
+        store = SQLiteLeaseStore(SHARD_LEASE_PATH)
+
+    return ShardCoordinator(
+        store, worker_id=SHARD_WORKER_ID,
+        shard_count=SHARD_COUNT, lease_ttl=SHARD_LEASE_TTL
+    )
+
+
+async def stream_sells(evaluator: MarketConditionsEvaluator):
+    while True:
+        try:
+            await asyncio.to_thread(evaluator.refresh_holdings)
+
+            stream = FoxbitPriceStream(
+                url=FOXBIT_WS_URL,
+                market_symbols=[f"{symbol}brl" for symbol in evaluator.threshold_index.symbols()]
+            )
+
+            await asyncio.wait_for(
+                evaluator.consume_price_stream(stream), timeout=HOLDINGS_REFRESH_SECONDS
+            )
+        except asyncio.TimeoutError:
+            continue
+        except Exception as error:
+            log.error(f"[UNEXPECTED ERROR] price stream: {error}")
+            await asyncio.sleep(300)
 
 
 async def main():
-    evaluator = MarketConditionsEvaluator()
+    evaluator = MarketConditionsEvaluator(
+        shard_coordinator=build_shard_coordinator(),
+        price_table=LastPriceTable() if STREAMING_QUOTES else None,
+        order_executor=OrderExecutor(
+            concurrency=ORDER_CONCURRENCY, rate_per_second=ORDER_RATE_PER_SECOND,
+            dedup_window=ORDER_DEDUP_WINDOW
+        ),
+        poll_scheduler=AdaptivePollScheduler(
+            min_interval=POLL_MIN_SECONDS, max_interval=POLL_MAX_SECONDS,
+            sigmas=POLL_VOLATILITY_SIGMAS
+        ) if ADAPTIVE_POLLING else None
+    )
+
+    snapshot = WarmStateSnapshot(SNAPSHOT_PATH, max_age=SNAPSHOT_MAX_AGE_SECONDS)
+    warm_state = snapshot.load()
+
+    if warm_state:
+        evaluator.restore_warm_state(warm_state)
+
+    snapshot_saved_at = time.time()
+
+    memory_monitor = MemoryMonitor(
+        ceiling_mb=MEMORY_CEILING_MB, snapshot_interval=MEMORY_SNAPSHOT_INTERVAL,
+        top_n=MEMORY_TOP_N
+    ) if MEMORY_MONITOR else None
+
+    if memory_monitor:
+        evaluator.register_caches(memory_monitor)
+
+    await evaluator.order_executor.start()
+
+    stream_task = asyncio.create_task(stream_sells(evaluator)) if STREAMING_QUOTES else None
+
+    profiler = TickProfiler(
+        PROFILE_DIR, threshold=PROFILE_THRESHOLD_SECONDS,
+        max_profiles=PROFILE_MAX_FILES, mode=PROFILE_MODE
+    ) if PROFILE_TICKS else None
+
     while True:
         try:
-            await evaluator.evaluate_market_conditions()
+            with profiler.tick() if profiler else nullcontext(), deadline(TICK_DEADLINE_SECONDS):
+                await evaluator.evaluate_market_conditions()
+            log.info(f"[http] {http.snapshot()}")
+
+            if memory_monitor:
+                memory_monitor.on_tick()
+
+            if time.time() - snapshot_saved_at >= SNAPSHOT_INTERVAL_SECONDS:
+                snapshot.save(evaluator.export_warm_state())
+                snapshot_saved_at = time.time()
+
+            await asyncio.sleep(30)
+        except (CircuitOpenError, DeadlineExceeded, requests.RequestException) as error:
+            # Upstream is down or slow: fail fast and retry on the normal cadence.
+            log.error(f"[UPSTREAM UNAVAILABLE] {error} {http.snapshot()}")
             await asyncio.sleep(30)
         except Exception as error:
             log.error(f"[UNEXPECTED ERROR] {error}")
@@ -1,10 +1,39 @@
 __all__ = [
     "log", "ENVIRONMENT", "ENCRYPTATION_KEY", 
     "FIREBASE_URL", "FIREBASE_API_KEY", "COINGECKO_API_KEY", 
+    "SHARDING_ENABLED", "SHARD_WORKER_ID", "SHARD_COUNT",
+    "SHARD_LEASE_BACKEND", "SHARD_LEASE_PATH", "SHARD_LEASE_TTL",
+    "STREAMING_QUOTES", "FOXBIT_WS_URL", "HOLDINGS_REFRESH_SECONDS",
+    "ORDER_CONCURRENCY", "ORDER_RATE_PER_SECOND", "ORDER_DEDUP_WINDOW",
+    "PREDICTION_BACKEND", "HTTP_CACHE_ENABLED", "HTTP_CACHE_DIR",
+    "CANDLES_DIR", "CANDLE_HISTORY_MIN_DAYS", "PROFILE_TICKS", "PROFILE_MODE",
+    "PROFILE_THRESHOLD_SECONDS", "PROFILE_MAX_FILES", "PROFILE_DIR", "TickProfiler",
+    "HTTP_CONNECT_TIMEOUT", "HTTP_READ_TIMEOUT", "HTTP_MAX_RETRIES",
+    "HTTP_BREAKER_FAILURES", "HTTP_BREAKER_RESET_SECONDS", "TICK_DEADLINE_SECONDS",
+    "HISTORY_CACHE_SECONDS", "SNAPSHOT_PATH", "SNAPSHOT_INTERVAL_SECONDS", "SNAPSHOT_MAX_AGE_SECONDS",
+    "MEMORY_MONITOR", "MEMORY_CEILING_MB", "MEMORY_SNAPSHOT_INTERVAL", "MEMORY_TOP_N",
+    "ADAPTIVE_POLLING", "POLL_MIN_SECONDS", "POLL_MAX_SECONDS", "POLL_VOLATILITY_SIGMAS",
+    "MemoryMonitor", "current_rss_mb",
+    "build_cached_session", "FileStoreCache", "EndpointTTLHeuristic",
 ]
 
 from .logger import log
 from .settings import (
     ENVIRONMENT, ENCRYPTATION_KEY, FIREBASE_URL, 
-    FIREBASE_API_KEY, COINGECKO_API_KEY
+    FIREBASE_API_KEY, COINGECKO_API_KEY,
+    SHARDING_ENABLED, SHARD_WORKER_ID, SHARD_COUNT,
+    SHARD_LEASE_BACKEND, SHARD_LEASE_PATH, SHARD_LEASE_TTL,
+    STREAMING_QUOTES, FOXBIT_WS_URL, HOLDINGS_REFRESH_SECONDS,
+    ORDER_CONCURRENCY, ORDER_RATE_PER_SECOND, ORDER_DEDUP_WINDOW,
+    PREDICTION_BACKEND, HTTP_CACHE_ENABLED, HTTP_CACHE_DIR,
+    CANDLES_DIR, CANDLE_HISTORY_MIN_DAYS, PROFILE_TICKS, PROFILE_MODE,
+    PROFILE_THRESHOLD_SECONDS, PROFILE_MAX_FILES, PROFILE_DIR,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES,
+    HTTP_BREAKER_FAILURES, HTTP_BREAKER_RESET_SECONDS, TICK_DEADLINE_SECONDS,
+    HISTORY_CACHE_SECONDS, SNAPSHOT_PATH, SNAPSHOT_INTERVAL_SECONDS, SNAPSHOT_MAX_AGE_SECONDS,
+    MEMORY_MONITOR, MEMORY_CEILING_MB, MEMORY_SNAPSHOT_INTERVAL, MEMORY_TOP_N,
+    ADAPTIVE_POLLING, POLL_MIN_SECONDS, POLL_MAX_SECONDS, POLL_VOLATILITY_SIGMAS
 )
+from .http_cache import build_cached_session, FileStoreCache, EndpointTTLHeuristic
+from .profiler import TickProfiler
+from .memory import MemoryMonitor, current_rss_mb
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import calendar
+import time
+from email.utils import formatdate
+from pathlib import Path
+
+import requests
+from cachecontrol import CacheControl
+from cachecontrol.cache import BaseCache
+from cachecontrol.heuristics import BaseHeuristic
+
+
+class FileStoreCache(BaseCache):
+    """
+    File-backed store for CacheControl, one file per cache key.
+
+    Writes go through a temporary file and `os.replace`, so concurrent
+    workers never read a half-written response.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        expires_at = int.from_bytes(data[:8], "big")
+
+        if expires_at and expires_at < time.time():
+            self.delete(key)
+            return None
+
+        return data[8:]
+
+    def set(self, key: str, value: bytes, expires: int | None = None) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        expires_at = int(time.time() + expires) if expires else 0
+
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(expires_at.to_bytes(8, "big") + value)
+        os.replace(temporary, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class EndpointTTLHeuristic(BaseHeuristic):
+    """
+    Overrides the freshness lifetime of responses whose URL contains one of
+    the configured path fragments; other responses keep upstream headers.
+    """
+
+    def __init__(self, ttls: dict) -> None:
+        self.ttls: dict = ttls
+
+    def ttl_for(self, url: str) -> int | None:
+        for fragment, ttl in self.ttls.items():
+            if fragment in url:
+                return ttl
+        return None
+
+    def update_headers(self, response) -> dict:
+        ttl = self.ttl_for(response.url or "")
+
+        if ttl is None or response.status != 200:
+            return {}
+
+        date = response.headers.get("date")
+        now = calendar.timegm(time.gmtime())
+
+        return {
+            "cache-control": f"max-age={ttl}",
+            "date": date or formatdate(now, usegmt=True),
+        }
+
+    def warning(self, response) -> None:
+        return None
+
+
+def build_cached_session(directory: str, ttls: dict = None) -> requests.Session:
+    """
+    A requests session that caches responses on disk, honours ETag,
+    Last-Modified and Cache-Control (revalidating with conditional requests
+    once stale) and applies per-endpoint TTL overrides.
+    """
+    return CacheControl(
+        requests.Session(),
+        cache=FileStoreCache(directory),
+        heuristic=EndpointTTLHeuristic(ttls or {}),
+        cacheable_methods=("GET",),
+    )
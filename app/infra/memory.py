@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+import gc
+import os
+import reprlib
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable
+
+from .logger import log
+
+
+def current_rss_mb() -> float:
+    """Current resident set size; falls back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class MemoryMonitor:
+    """
+    Per-tick memory instrumentation for the evaluator loop.
+
+    Logs RSS every tick; every `snapshot_interval` ticks logs the top `top_n`
+    allocation sites that grew since the previous tracemalloc snapshot and
+    the largest live objects; sheds the registered caches when RSS goes over
+    `ceiling_mb`. Zero disables the snapshots or the ceiling. The object
+    report after shedding walks every live object, so it runs at most once
+    per `report_interval` seconds while memory stays over the ceiling.
+    """
+
+    def __init__(
+        self, ceiling_mb: float = 0, snapshot_interval: int = 0, top_n: int = 10,
+        report_interval: float = 600.0
+    ) -> None:
+        self.ceiling_mb: float = ceiling_mb
+        self.snapshot_interval: int = snapshot_interval
+        self.top_n: int = top_n
+        self.report_interval: float = report_interval
+        self.reported_at: float | None = None
+        self.ticks: int = 0
+        self.baseline_rss_mb: float = current_rss_mb()
+        self.previous_snapshot = None
+        self.caches: dict = {}
+
+        if snapshot_interval and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    def register_cache(self, name: str, shed: Callable[[], None]) -> None:
+        self.caches[name] = shed
+
+    def on_tick(self) -> None:
+        self.ticks += 1
+        rss_mb = current_rss_mb()
+
+        log.info(
+            f"[MemoryMonitor] tick {self.ticks}: RSS {rss_mb:.1f} MB "
+            f"({rss_mb - self.baseline_rss_mb:+.1f} MB since start)"
+        )
+
+        if self.snapshot_interval and self.ticks % self.snapshot_interval == 0:
+            self.log_allocation_diff()
+            self.report()
+
+        if self.ceiling_mb and rss_mb > self.ceiling_mb:
+            self.shed(rss_mb)
+
+    def log_allocation_diff(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+        if self.previous_snapshot:
+            stats = snapshot.compare_to(self.previous_snapshot, "lineno")
+            log.info(f"[MemoryMonitor] top {self.top_n} allocation growth since last snapshot:")
+            for stat in stats[:self.top_n]:
+                log.info(f"[MemoryMonitor]   {stat}")
+
+        self.previous_snapshot = snapshot
+
+    def shed(self, rss_mb: float) -> None:
+        log.warn(f"[MemoryMonitor] RSS {rss_mb:.1f} MB over ceiling {self.ceiling_mb:.0f} MB, shedding caches")
+
+        for name, shed in self.caches.items():
+            try:
+                shed()
+            except Exception as error:
+                log.error(f"[MemoryMonitor] shedding {name} failed: {error}")
+
+        gc.collect()
+
+        log.warn(f"[MemoryMonitor] RSS after shedding: {current_rss_mb():.1f} MB")
+
+        if self.reported_at is None or time.monotonic() - self.reported_at >= self.report_interval:
+            self.report()
+
+    def largest_objects(self, limit: int = 10) -> list:
+        """
+        The largest live objects tracked by the garbage collector, by
+        `sys.getsizeof` (which pandas objects answer with their deep size).
+        """
+        sized = []
+        for obj in gc.get_objects():
+            try:
+                sized.append((sys.getsizeof(obj), obj))
+            except Exception:
+                continue
+
+        sized.sort(key=lambda item: item[0], reverse=True)
+
+        return [
+            (type(obj).__name__, size, reprlib.repr(obj)) for size, obj in sized[:limit]
+        ]
+
+    def report(self) -> None:
+        self.reported_at = time.monotonic()
+        counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+
+        log.info(f"[MemoryMonitor] most common live types: {counts.most_common(self.top_n)}")
+
+        for type_name, size, preview in self.largest_objects(self.top_n):
+            log.info(f"[MemoryMonitor]   {size / 1024:.1f} KB {type_name}: {preview}")
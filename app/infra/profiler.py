@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import cProfile
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from .logger import log
+
+
+class StackSampler:
+    """
+    Background thread that periodically records the stack of every other
+    thread as collapsed "frame;frame;frame" strings while active.
+
+    The thread sleeps on an event between ticks, so an idle sampler costs
+    nothing and an active one costs one stack walk per interval. Each pass
+    runs under `lock`, and `stop` swaps the counter out under it, so the
+    returned samples are never written to afterwards.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval: float = interval
+        self.samples: Counter = Counter()
+        self.lock = threading.Lock()
+        self.active = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="tick-sampler", daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def collapse(frame, thread_name: str) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.append(thread_name)
+        return ";".join(reversed(stack))
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+
+        while True:
+            self.active.wait()
+
+            with self.lock:
+                if self.active.is_set():
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    for thread_id, frame in sys._current_frames().items():
+                        if thread_id != own_id:
+                            self.samples[self.collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+
+            time.sleep(self.interval)
+
+    def start(self) -> None:
+        with self.lock:
+            self.samples = Counter()
+            self.active.set()
+
+    def stop(self) -> Counter:
+        with self.lock:
+            self.active.clear()
+            samples, self.samples = self.samples, Counter()
+        return samples
+
+
+class TickProfiler:
+    """
+    Profiles every tick and keeps the profile only when the tick ran longer
+    than `threshold` seconds.
+
+    `mode="sampling"` writes a collapsed-stack file (flamegraph.pl /
+    speedscope input); `mode="cprofile"` writes a pstats dump. Only the
+    newest `max_profiles` files are kept.
+    """
+
+    def __init__(
+        self, directory: str, threshold: float = 60.0,
+        max_profiles: int = 20, mode: str = "sampling", interval: float = 0.005
+    ) -> None:
+        self.directory = Path(directory)
+        self.threshold: float = threshold
+        self.max_profiles: int = max_profiles
+        self.mode: str = mode
+        self.sampler = StackSampler(interval) if mode == "sampling" else None
+
+    @contextmanager
+    def tick(self) -> Iterator[None]:
+        started_at = datetime.now()
+        started = time.perf_counter()
+
+        profile = cProfile.Profile() if self.mode == "cprofile" else None
+
+        if profile:
+            profile.enable()
+        else:
+            self.sampler.start()
+
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            else:
+                samples = self.sampler.stop()
+
+            elapsed = time.perf_counter() - started
+
+            if elapsed >= self.threshold:
+                path = self.save(started_at, profile if profile else samples)
+                log.warn(f"[TickProfiler] slow tick ({elapsed:.1f}s), profile saved to {path}")
+
+    def save(self, started_at: datetime, data) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"tick-{started_at.strftime('%Y%m%d%H%M%S')}"
+
+        if isinstance(data, cProfile.Profile):
+            path = self.directory / f"{name}.pstats"
+            data.dump_stats(str(path))
+        else:
+            path = self.directory / f"{name}.collapsed"
+            path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in data.most_common())
+            )
+
+        self.prune()
+        return path
+
+    def prune(self) -> None:
+        profiles = sorted(
+            (path for path in self.directory.glob("tick-*") if path.suffix in (".pstats", ".collapsed")),
+            key=lambda path: path.stat().st_mtime
+        )
+
+        for path in profiles[:-self.max_profiles]:
+            path.unlink(missing_ok=True)
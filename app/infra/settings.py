@@ -4,6 +4,7 @@ from typing import Any
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import socket
 
 load_dotenv()
 
@@ -17,3 +18,93 @@ FIREBASE_URL: str = os.getenv("FIREBASE_URL", "")
 FIREBASE_API_KEY: str = os.getenv("FIREBASE_API_KEY", "")
 
 COINGECKO_API_KEY: str = os.getenv("COINGECKO_API_KEY", "")
+
+SHARDING_ENABLED: bool = os.getenv("SHARDING_ENABLED", "false").lower() == "true"
+
+SHARD_WORKER_ID: str = os.getenv("SHARD_WORKER_ID", f"{socket.gethostname()}-{os.getpid()}")
+
+SHARD_COUNT: int = int(os.getenv("SHARD_COUNT", "64"))
+
+SHARD_LEASE_BACKEND: str = os.getenv("SHARD_LEASE_BACKEND", "sqlite")
+
+SHARD_LEASE_PATH: str = os.getenv(
+    "SHARD_LEASE_PATH", str(Path(__file__).resolve().parent.parent / "data" / "shards.sqlite3")
+)
+
+SHARD_LEASE_TTL: int = int(os.getenv("SHARD_LEASE_TTL", "120"))
+
+STREAMING_QUOTES: bool = os.getenv("STREAMING_QUOTES", "false").lower() == "true"
+
+FOXBIT_WS_URL: str = os.getenv("FOXBIT_WS_URL", "wss://api.foxbit.com.br/ws/v3/public")
+
+HOLDINGS_REFRESH_SECONDS: int = int(os.getenv("HOLDINGS_REFRESH_SECONDS", "300"))
+
+ORDER_CONCURRENCY: int = int(os.getenv("ORDER_CONCURRENCY", "4"))
+
+ORDER_RATE_PER_SECOND: float = float(os.getenv("ORDER_RATE_PER_SECOND", "2"))
+
+ORDER_DEDUP_WINDOW: int = int(os.getenv("ORDER_DEDUP_WINDOW", "600"))
+
+PREDICTION_BACKEND: str = os.getenv("PREDICTION_BACKEND", "sklearn")
+
+HTTP_CACHE_ENABLED: bool = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+
+HTTP_CACHE_DIR: str = os.getenv(
+    "HTTP_CACHE_DIR", str(Path(__file__).resolve().parent.parent / "data" / "http_cache")
+)
+
+CANDLES_DIR: str = os.getenv(
+    "CANDLES_DIR", str(Path(__file__).resolve().parent.parent / "data" / "candles")
+)
+
+CANDLE_HISTORY_MIN_DAYS: int = int(os.getenv("CANDLE_HISTORY_MIN_DAYS", "90"))
+
+PROFILE_TICKS: bool = os.getenv("PROFILE_TICKS", "false").lower() == "true"
+
+PROFILE_MODE: str = os.getenv("PROFILE_MODE", "sampling")
+
+PROFILE_THRESHOLD_SECONDS: float = float(os.getenv("PROFILE_THRESHOLD_SECONDS", "60"))
+
+PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", "20"))
+
+PROFILE_DIR: str = os.getenv(
+    "PROFILE_DIR", str(Path(__file__).resolve().parent.parent / "data" / "profiles")
+)
+
+HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+
+HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+
+HTTP_BREAKER_FAILURES: int = int(os.getenv("HTTP_BREAKER_FAILURES", "5"))
+
+HTTP_BREAKER_RESET_SECONDS: float = float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30"))
+
+TICK_DEADLINE_SECONDS: float = float(os.getenv("TICK_DEADLINE_SECONDS", "600"))
+
+HISTORY_CACHE_SECONDS: int = int(os.getenv("HISTORY_CACHE_SECONDS", "3600"))
+
+SNAPSHOT_PATH: str = os.getenv(
+    "SNAPSHOT_PATH", str(Path(__file__).resolve().parent.parent / "data" / "warm_state.msgpack")
+)
+
+SNAPSHOT_INTERVAL_SECONDS: int = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "300"))
+
+SNAPSHOT_MAX_AGE_SECONDS: int = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "3600"))
+
+MEMORY_MONITOR: bool = os.getenv("MEMORY_MONITOR", "false").lower() == "true"
+
+MEMORY_CEILING_MB: float = float(os.getenv("MEMORY_CEILING_MB", "0"))
+
+MEMORY_SNAPSHOT_INTERVAL: int = int(os.getenv("MEMORY_SNAPSHOT_INTERVAL", "0"))
+
+MEMORY_TOP_N: int = int(os.getenv("MEMORY_TOP_N", "10"))
+
+ADAPTIVE_POLLING: bool = os.getenv("ADAPTIVE_POLLING", "false").lower() == "true"
+
+POLL_MIN_SECONDS: float = float(os.getenv("POLL_MIN_SECONDS", "30"))
+
+POLL_MAX_SECONDS: float = float(os.getenv("POLL_MAX_SECONDS", "1800"))
+
+POLL_VOLATILITY_SIGMAS: float = float(os.getenv("POLL_VOLATILITY_SIGMAS", "4"))
@@ -1,12 +1,59 @@
+import sys
+import time
+import tracemalloc
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-from infra import log, COINGECKO_API_KEY
+from infra import log, COINGECKO_API_KEY, current_rss_mb
 from apis import Coingecko
 
 
+class NumpyLinearRegression:
+    """
+    Ordinary least squares solved in closed form with NumPy.
+
+    Mirrors the parts of sklearn's LinearRegression used by PriceIndicator
+    (fit, predict, coef_, intercept_) without its input validation overhead.
+    """
+
+    def __init__(self):
+        self.coef_ = None
+        self.intercept_ = None
+
+    def fit(self, X, y):
+        """
+        Solves min ||[X 1] w - y||² with lstsq, which stays stable on the
+        highly collinear lagged-price features where the normal equations do not.
+        """
+        X = np.asarray(X, dtype=float)
+        design = np.hstack([X, np.ones((X.shape[0], 1))])
+        solution, *_ = np.linalg.lstsq(design, np.asarray(y, dtype=float), rcond=None)
+
+        self.coef_ = solution[:-1]
+        self.intercept_ = float(solution[-1])
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+
+def regression_metrics(y_true, y_pred) -> dict:
+    """
+    Computes MAE, RMSE and R² with NumPy, matching sklearn's definitions.
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    residuals = y_true - np.asarray(y_pred, dtype=float)
+
+    ss_res = float(residuals @ residuals)
+    ss_tot = float(((y_true - y_true.mean()) ** 2).sum())
+
+    return {
+        'MAE': float(np.abs(residuals).mean()),
+        'RMSE': float(np.sqrt(ss_res / len(y_true))),
+        'R²': 1.0 - ss_res / ss_tot if ss_tot else 0.0
+    }
+
+
 class PriceIndicator:
     """
     A class to predict crypto prices using Linear Regression.
@@ -22,12 +69,14 @@ class PriceIndicator:
         X_test (np.ndarray): Testing feature matrix.
         y_train (np.ndarray): Training target vector.
         y_test (np.ndarray): Testing target vector.
-        model (LinearRegression): The Linear Regression model.
+        backend (str): Regression backend, "sklearn" or "numpy".
+        model (LinearRegression | NumpyLinearRegression): The Linear Regression model.
         predictions (np.ndarray): Predictions on the test set.
         resultados (dict): Dictionary containing evaluation metrics.
+        price_prefix (np.ndarray): Prefix sums of the price column, built once for multi-window analysis.
     """
 
-    def __init__(self, history_data, window_size=14, test_size=14):
+    def __init__(self, history_data, window_size=14, test_size=14, backend="sklearn"):
         """
         Initializes the PriceIndicator with the given parameters.
 
@@ -35,6 +84,8 @@ class PriceIndicator:
             history_data (pd.DataFrame): Dataframe containing crypto price data.
             window_size (int, optional): Number of days to consider for creating features. Defaults to 14.
             test_size (int, optional): Number of recent days to exclude from training for testing. Defaults to 14.
+            backend (str, optional): "sklearn" for scikit-learn's LinearRegression or "numpy" for the
+                closed-form NumPy solver, which does not import scikit-learn at all. Defaults to "sklearn".
         """
         self.history_data = history_data
         self.window_size = window_size
@@ -46,9 +97,23 @@ class PriceIndicator:
         self.X_test = None
         self.y_train = None
         self.y_test = None
-        self.model = LinearRegression()
+        self.backend = backend
+        self.model = self.build_model(backend)
         self.predictions = None
         self.resultados = {}
+        self.price_prefix = None
+
+    @staticmethod
+    def build_model(backend):
+        """
+        Instantiates the regression model for the given backend.
+        """
+        if backend == "numpy":
+            return NumpyLinearRegression()
+        if backend == "sklearn":
+            from sklearn.linear_model import LinearRegression
+            return LinearRegression()
+        raise ValueError(f"Unknown regression backend: {backend}")
 
     def load_and_preprocess_data(self):
         """
@@ -63,6 +128,7 @@ class PriceIndicator:
         self.df['datetime'] = pd.to_datetime(self.df['datetime'])
         self.df = self.df.sort_values(by="datetime", ascending=True)
         self.df.reset_index(drop=True, inplace=True)
+        self.price_prefix = None
 
     def create_features_and_target(self):
         """
@@ -105,11 +171,16 @@ class PriceIndicator:
         """
         self.predictions = self.model.predict(self.X_test)
 
-        mae = mean_absolute_error(self.y_test, self.predictions)
-        rmse = np.sqrt(mean_squared_error(self.y_test, self.predictions))
-        r2 = r2_score(self.y_test, self.predictions)
+        if self.backend == "numpy":
+            self.resultados = regression_metrics(self.y_test, self.predictions)
+        else:
+            from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+            mae = mean_absolute_error(self.y_test, self.predictions)
+            rmse = np.sqrt(mean_squared_error(self.y_test, self.predictions))
+            r2 = r2_score(self.y_test, self.predictions)
 
-        self.resultados = {'MAE': float(mae), 'RMSE': float(rmse), 'R²': r2}
+            self.resultados = {'MAE': float(mae), 'RMSE': float(rmse), 'R²': r2}
         log.info(f"\n### Evaluation Metrics on Test Set ###")
         log.info(f"MAE: {self.resultados['MAE']:.2f}")
         log.info(f"RMSE: {self.resultados['RMSE']:.2f}")
@@ -155,6 +226,69 @@ class PriceIndicator:
             double_percent_difference, double_status
         )
 
+    def build_prefix_index(self):
+        """
+        Builds the prefix-sum index over the price column, so the mean of
+        the last w prices is (prefix[n] - prefix[n - w]) / w in O(1).
+        """
+        prices = self.df['price'].to_numpy(dtype=float)
+        self.price_prefix = np.concatenate(([0.0], np.cumsum(prices)))
+
+    def analyze_windows(self, windows=(7, 14, 28, 56)) -> dict:
+        """
+        Compares the latest price to the average of each window of recent days.
+
+        Args:
+            windows (iterable of int, optional): Window lengths in days. Windows longer than
+                the history are clamped to the full history. Defaults to (7, 14, 28, 56).
+
+        Returns:
+            dict: {window: {"average": float, "percent_difference": float, "status": "above" | "below"}}
+
+        Raises:
+            ValueError: If a window is not a positive number of days or the history is empty.
+        """
+        invalid = [window for window in windows if int(window) <= 0]
+        if invalid:
+            raise ValueError(f"Windows must be positive numbers of days: {invalid}")
+
+        if self.price_prefix is None:
+            self.build_prefix_index()
+
+        total = len(self.price_prefix) - 1
+        if total == 0:
+            raise ValueError("No price history to analyze")
+
+        latest_price = float(self.df['price'].iloc[-1])
+
+        signals = {}
+
+        log.info(f"\n### Multi-window Analysis (latest price: ${latest_price:.2f}) ###")
+
+        for window in windows:
+            days = min(int(window), total)
+
+            average = (self.price_prefix[total] - self.price_prefix[total - days]) / days
+            percent_difference = ((latest_price - average) / average) * 100
+            status = "above" if latest_price > average else "below"
+
+            signals[window] = {
+                "average": float(average),
+                "percent_difference": float(percent_difference),
+                "status": status
+            }
+
+            log.info(f"Last {window} days: average ${average:.2f}, {percent_difference:.1f}% ({status})")
+
+        return signals
+
+    def run_windows(self, windows=(7, 14, 28, 56)) -> dict:
+        """
+        Loads the history and runs only the multi-window analysis, without fitting the model.
+        """
+        self.load_and_preprocess_data()
+        return self.analyze_windows(windows)
+
     def predict_next_day(self):
         """
         Predicts the price for the next day using the last (window_size - 1) days as features.
@@ -205,6 +339,63 @@ class PriceIndicator:
         )
 
 
+def benchmark_backends(history_data, rounds=200) -> dict:
+    """
+    Checks the NumPy backend against sklearn and measures fits per second
+    and memory for each one.
+
+    The timed loop runs untraced; allocations are measured in a separate
+    tracemalloc pass of `rounds // 10` fits, since tracing slows fitting
+    down unevenly across backends. The NumPy backend runs first, so the
+    current RSS growth reported for sklearn is the cost of importing and
+    using it.
+    """
+    results = {}
+
+    for backend in ("numpy", "sklearn"):
+        rss_before = current_rss_mb()
+
+        predictor = PriceIndicator(history_data.copy(), backend=backend)
+        predictor.load_and_preprocess_data()
+        predictor.create_features_and_target()
+        predictor.split_data()
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            predictor.train_model()
+            predictor.model.predict(predictor.X_test)
+        elapsed = time.perf_counter() - started
+
+        rss_growth = current_rss_mb() - rss_before
+
+        tracemalloc.start()
+        for _ in range(max(rounds // 10, 1)):
+            predictor.train_model()
+            predictor.model.predict(predictor.X_test)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        predictor.evaluate_model()
+
+        results[backend] = {
+            "fits_per_second": rounds / elapsed,
+            "peak_traced_kb": peak / 1024,
+            "rss_growth_mb": rss_growth,
+            "metrics": predictor.resultados,
+            "predictions": predictor.predictions,
+        }
+
+    np.testing.assert_allclose(
+        results["numpy"]["predictions"], results["sklearn"]["predictions"], rtol=1e-5
+    )
+    for metric in ("MAE", "RMSE", "R²"):
+        np.testing.assert_allclose(
+            results["numpy"]["metrics"][metric], results["sklearn"]["metrics"][metric], rtol=1e-5
+        )
+
+    return results
+
+
 if __name__ == "__main__":
     coingecko: object = Coingecko(
         coingecko_api_key=COINGECKO_API_KEY
@@ -214,6 +405,15 @@ if __name__ == "__main__":
         crypto="bitcoin", days=365
     )
 
+    if "--benchmark" in sys.argv:
+        for backend, result in benchmark_backends(crypto_history_df).items():
+            print(
+                f"{backend}: {result['fits_per_second']:.0f} fits/s, "
+                f"peak traced {result['peak_traced_kb']:.0f} KB, "
+                f"RSS +{result['rss_growth_mb']:.1f} MB"
+            )
+        sys.exit(0)
+
     predictor = PriceIndicator(crypto_history_df)  # csv_path="./reports/bitcoin.csv"
 
     percent_difference, status, double_percent_difference, double_status, prediction_difference, prediction_status = (
@@ -229,3 +429,8 @@ if __name__ == "__main__":
     print(
         f"prediction_status {prediction_difference:.1f}%, prediction_status {prediction_status}"
     )
+
+    for window, signal in predictor.analyze_windows().items():
+        print(
+            f"window {window}d: {signal['percent_difference']:.2f}%, status {signal['status']}"
+        )
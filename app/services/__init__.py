@@ -1,3 +1,21 @@
-__all__ = ["MediaMovel"]
+__all__ = [
+    "MediaMovel", "ConsistentHashRing", "ShardCoordinator",
+    "SQLiteLeaseStore", "FirebaseLeaseStore", "LastPriceTable",
+    "OrderExecutor", "AsyncRateLimiter", "CandleAggregator", "CandleSeries",
+    "TradeHistoryStore", "TradeHistoryIngester", "cost_basis",
+    "WarmStateSnapshot", "pack_history", "unpack_history",
+    "SellThresholdIndex", "sell_threshold_price",
+    "AdaptivePollScheduler", "daily_volatility",
+]
 
 from .media_movel import MediaMovel
+from .sharding import (
+    ConsistentHashRing, ShardCoordinator, SQLiteLeaseStore, FirebaseLeaseStore
+)
+from .price_table import LastPriceTable
+from .order_executor import OrderExecutor, AsyncRateLimiter
+from .candles import CandleAggregator, CandleSeries
+from .trade_history import TradeHistoryStore, TradeHistoryIngester, cost_basis
+from .snapshot import WarmStateSnapshot, pack_history, unpack_history
+from .threshold_index import SellThresholdIndex, sell_threshold_price
+from .poll_scheduler import AdaptivePollScheduler, daily_volatility
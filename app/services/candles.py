@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from array import array
+from pathlib import Path
+
+import pandas as pd
+
+
+RESOLUTIONS: dict = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# start, open, high, low, close, volume
+FIELDS: int = 6
+CANDLE_BYTES: int = FIELDS * array("d").itemsize
+
+
+class CandleSeries:
+    """
+    OHLCV candles of one symbol at one resolution.
+
+    The open candle is kept as plain floats and updated in O(1) per tick.
+    Closed candles are buffered in a flat `array('d')` segment and appended
+    to a binary file (6 doubles per candle) whenever the segment fills up or
+    the aggregator is flushed. A flush also writes the open candle, which is
+    rewritten in place by the next flush.
+    """
+
+    def __init__(self, path: Path, seconds: int, segment_size: int = 512) -> None:
+        self.path: Path = path
+        self.seconds: int = seconds
+        self.segment_size: int = segment_size
+        self.segment: array = array("d")
+        self.current: list | None = None
+        self.open_on_disk: bool = False
+
+    def truncate_last(self) -> None:
+        size = self.path.stat().st_size
+        with open(self.path, "r+b") as file:
+            file.truncate(size - CANDLE_BYTES)
+
+    def resume(self, start: float) -> None:
+        """
+        After a restart, reopens the last persisted candle if the new quote
+        still falls into it, instead of writing a duplicate bucket.
+        """
+        last = self.stored(limit=1)
+
+        if len(last) == FIELDS and last[0] == start:
+            self.truncate_last()
+            self.current = list(last)
+
+    def update(self, price: float, timestamp: float, volume: float = 0.0) -> None:
+        start = timestamp - timestamp % self.seconds
+
+        if self.current is None:
+            self.resume(start)
+
+        if self.current and start == self.current[0]:
+            current = self.current
+            current[2] = max(current[2], price)
+            current[3] = min(current[3], price)
+            current[4] = price
+            current[5] += volume
+            return
+
+        if self.current and start < self.current[0]:
+            # Late quote for a candle that is already closed.
+            return
+
+        closed, self.current = self.current, [start, price, price, price, price, volume]
+
+        if closed:
+            self.segment.extend(closed)
+            if len(self.segment) >= self.segment_size * FIELDS:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self.segment and not self.current:
+            return
+
+        if self.open_on_disk:
+            self.truncate_last()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as file:
+            self.segment.tofile(file)
+            if self.current:
+                array("d", self.current).tofile(file)
+
+        self.segment = array("d")
+        self.open_on_disk = self.current is not None
+
+    def stored(self, limit: int | None = None) -> array:
+        candles = array("d")
+
+        if not self.path.exists():
+            return candles
+
+        count = self.path.stat().st_size // CANDLE_BYTES
+        skip = max(count - limit, 0) if limit else 0
+
+        with open(self.path, "rb") as file:
+            file.seek(skip * CANDLE_BYTES)
+            candles.fromfile(file, (count - skip) * FIELDS)
+
+        return candles
+
+    def candles(self, limit: int | None = None, include_open: bool = True) -> list:
+        """Returns up to `limit` most recent candles as (start, o, h, l, c, v) tuples."""
+        flat = self.stored(limit)
+        if self.open_on_disk:
+            del flat[-FIELDS:]
+        flat.extend(self.segment)
+        if include_open and self.current:
+            flat.extend(self.current)
+
+        rows = [tuple(flat[i:i + FIELDS]) for i in range(0, len(flat), FIELDS)]
+
+        return rows[-limit:] if limit else rows
+
+
+class CandleAggregator:
+    """
+    Folds every observed quote into OHLCV candles at several resolutions.
+
+    Quotes arrive on the event loop while predictions read histories on
+    worker threads, so every access goes through `lock`.
+    """
+
+    def __init__(
+        self, directory: str, resolutions: dict = RESOLUTIONS, segment_size: int = 512
+    ) -> None:
+        self.directory: Path = Path(directory)
+        self.resolutions: dict = resolutions
+        self.segment_size: int = segment_size
+        self.series: dict = {}
+        self.lock = threading.RLock()
+
+    def get_series(self, symbol: str, resolution: str) -> CandleSeries:
+        key = (symbol, resolution)
+
+        if key not in self.series:
+            self.series[key] = CandleSeries(
+                self.directory / f"{symbol}_{resolution}.bin",
+                self.resolutions[resolution], self.segment_size
+            )
+
+        return self.series[key]
+
+    def update(
+        self, symbol: str, price: float, timestamp: float = None, volume: float = 0.0
+    ) -> None:
+        timestamp = timestamp or time.time()
+
+        with self.lock:
+            for resolution in self.resolutions.keys():
+                self.get_series(symbol, resolution).update(price, timestamp, volume)
+
+    def flush(self) -> None:
+        with self.lock:
+            for series in self.series.values():
+                series.flush()
+
+    def candles(self, symbol: str, resolution: str, limit: int | None = None) -> list:
+        with self.lock:
+            return self.get_series(symbol, resolution).candles(limit)
+
+    def coverage(self, symbol: str, resolution: str, periods: int) -> float:
+        """
+        Fraction of the last `periods` buckets, up to the current one, that
+        hold an observed candle.
+        """
+        seconds = self.resolutions[resolution]
+        now = time.time()
+        since = now - now % seconds - (periods - 1) * seconds
+
+        observed = sum(
+            1 for start, *_ in self.candles(symbol, resolution, periods) if start >= since
+        )
+
+        return observed / periods
+
+    def history_frame(self, symbol: str, resolution: str = "1d", limit: int | None = None) -> pd.DataFrame:
+        """
+        Candle closes shaped like `Coingecko.get_crypto_history`
+        (timestamp in ms, datetime, price), ready for PriceIndicator.
+
+        Buckets without a candle (no quote seen, process down) are filled
+        with the previous close, so rows are consecutive periods and window
+        lengths in rows stay window lengths in time.
+        """
+        candles = self.candles(symbol, resolution, limit)
+
+        closes = pd.Series(
+            [close for _, _, _, _, close, _ in candles],
+            index=[int(start) for start, _, _, _, _, _ in candles],
+            dtype=float
+        )
+
+        if len(closes):
+            seconds = self.resolutions[resolution]
+            closes = closes.reindex(
+                range(closes.index[0], closes.index[-1] + seconds, seconds)
+            ).ffill()
+
+            if limit:
+                closes = closes.iloc[-limit:]
+
+        df = pd.DataFrame({"timestamp": closes.index.to_numpy(dtype="int64") * 1000, "price": closes.to_numpy()})
+        df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
+
+        return df[["timestamp", "datetime", "price"]]
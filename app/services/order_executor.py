@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable
+
+from infra import log
+
+
+class AsyncRateLimiter:
+    """Token bucket shared by the executor workers."""
+
+    def __init__(self, rate_per_second: float, burst: int = 1) -> None:
+        self.rate_per_second: float = rate_per_second
+        self.capacity: float = float(burst)
+        self.tokens: float = float(burst)
+        self.updated_at: float = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second
+                )
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate_per_second)
+
+
+class OrderExecutor:
+    """
+    Queue of order decisions submitted to Foxbit off the evaluation loop.
+
+    Every order carries a deterministic `client_order_id` derived from the
+    user, market, side and the holding state that produced it, a state that
+    changes once the order fills. A retried tick, or the same decision after
+    a restart, therefore produces the same id. Ids enqueued within the last
+    `dedup_window` seconds are dropped here, and Foxbit rejects a repeated
+    id if it still slips through.
+    Orders of different users are posted concurrently, orders of the same
+    user one at a time, all under a shared rate limit.
+    """
+
+    def __init__(
+        self, concurrency: int = 4, rate_per_second: float = 2.0,
+        dedup_window: int = 600, confirm_attempts: int = 3, confirm_delay: float = 1.0
+    ) -> None:
+        self.concurrency: int = concurrency
+        self.dedup_window: int = dedup_window
+        self.confirm_attempts: int = confirm_attempts
+        self.confirm_delay: float = confirm_delay
+        self.rate_limiter = AsyncRateLimiter(rate_per_second, burst=concurrency)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.submitted: dict = {}
+        self.user_locks: dict = {}
+        self.workers: list = []
+
+    def client_order_id(self, user: str, order: dict, state: Any = "") -> str:
+        key = f"{user}:{order['market_symbol']}:{order['side']}:{state}"
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def prune(self) -> None:
+        expired_before = time.time() - self.dedup_window
+        for client_order_id, submitted_at in list(self.submitted.items()):
+            if submitted_at < expired_before:
+                del self.submitted[client_order_id]
+
+    def enqueue(
+        self, user: str, foxbit: Any, order: dict, state: Any = "",
+        on_confirmed: Callable[[dict, Any], Awaitable[None]] = None,
+        guard: Callable[[dict], Awaitable[bool]] = None
+    ) -> str | None:
+        """
+        Enqueues an order and returns its client_order_id, or None when the
+        same decision was already enqueued in the current window. `guard`,
+        when given, is awaited with the order right before it is posted; it
+        may update the order, and drops it by returning False.
+        """
+        self.prune()
+
+        client_order_id = self.client_order_id(user, order, state)
+
+        if client_order_id in self.submitted:
+            log.info(f"[OrderExecutor] duplicate order {client_order_id} dropped: {order}")
+            return None
+
+        self.submitted[client_order_id] = time.time()
+        self.queue.put_nowait(
+            (user, foxbit, {**order, "client_order_id": client_order_id}, on_confirmed, guard)
+        )
+
+        return client_order_id
+
+    async def start(self) -> None:
+        self.workers = [
+            asyncio.create_task(self.worker(index)) for index in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        await self.queue.join()
+        for worker in self.workers:
+            worker.cancel()
+
+    async def worker(self, index: int) -> None:
+        while True:
+            user, foxbit, order, on_confirmed, guard = await self.queue.get()
+            try:
+                lock = self.user_locks.setdefault(user, asyncio.Lock())
+                async with lock:
+                    if guard and not await guard(order):
+                        log.warn(f"[OrderExecutor] order {order['client_order_id']} dropped by its guard")
+                        continue
+                    await self.execute(foxbit, order, on_confirmed)
+            except Exception as error:
+                log.error(f"[OrderExecutor] worker {index} failed on {order}: {error}")
+            finally:
+                self.queue.task_done()
+
+    async def execute(self, foxbit: Any, order: dict, on_confirmed: Callable = None) -> None:
+        await self.rate_limiter.acquire()
+
+        order_response = await asyncio.to_thread(
+            foxbit.request, "POST", "/rest/v3/orders", None, order
+        )
+
+        log.info(f"[OrderExecutor] {order['side']} ORDER: {order}")
+        log.info(f"[OrderExecutor] ORDER RESPONSE: {order_response}")
+
+        confirmation = await self.confirm(foxbit, order["client_order_id"])
+
+        if not confirmation:
+            log.error(f"[OrderExecutor] order {order['client_order_id']} not confirmed")
+            return
+
+        if on_confirmed:
+            await on_confirmed(order, confirmation)
+
+    async def confirm(self, foxbit: Any, client_order_id: str) -> dict | None:
+        for _ in range(self.confirm_attempts):
+            await asyncio.sleep(self.confirm_delay)
+            await self.rate_limiter.acquire()
+
+            confirmation = await asyncio.to_thread(
+                foxbit.request, "GET",
+                f"/rest/v3/orders/by-client-order-id/{client_order_id}", None, None
+            )
+
+            if confirmation:
+                return confirmation
+
+        return None
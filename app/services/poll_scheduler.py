@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+import math
+import time
+
+import numpy as np
+
+
+SECONDS_PER_DAY: int = 86400
+
+
+def daily_volatility(prices, lookback: int = 30) -> float | None:
+    """Standard deviation of the last `lookback` daily log returns."""
+    prices = np.asarray(prices, dtype=float)[-(lookback + 1):]
+    prices = prices[prices > 0]
+
+    if len(prices) < 3:
+        return None
+
+    return float(np.std(np.diff(np.log(prices)), ddof=1))
+
+
+class AdaptivePollScheduler:
+    """
+    Per-holding next-check times for the polling loop.
+
+    Treating the price as a random walk with daily volatility σ, a holding
+    whose trigger is a log gap `g` above the current price is unlikely to
+    reach it in less than (g / (sigmas · σ))² days, so it is not re-quoted
+    before then. The interval is clamped to [min_interval, max_interval];
+    holdings at or past their threshold, or never seen, are always due.
+
+    The evaluator skips a holding entirely until it is due, including its
+    balance refresh and the buy rule, so this is opt-in (ADAPTIVE_POLLING).
+    """
+
+    def __init__(
+        self, min_interval: float = 30.0, max_interval: float = 1800.0,
+        sigmas: float = 4.0, default_volatility: float = 0.05
+    ) -> None:
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.sigmas: float = sigmas
+        self.default_volatility: float = default_volatility
+        self.next_check: dict = {}
+        self.polled: int = 0
+        self.skipped: int = 0
+
+    def due(self, key: str, now: float = None) -> bool:
+        if (now or time.time()) >= self.next_check.get(key, 0.0):
+            self.polled += 1
+            return True
+
+        self.skipped += 1
+        return False
+
+    def interval(self, price: float, threshold: float, volatility: float | None) -> float:
+        if price <= 0 or threshold <= price:
+            return self.min_interval
+
+        if math.isinf(threshold):
+            return self.max_interval
+
+        sigma = volatility if volatility and volatility > 0 else self.default_volatility
+        gap = math.log(threshold / price)
+        seconds = (gap / (self.sigmas * sigma)) ** 2 * SECONDS_PER_DAY
+
+        return min(max(seconds, self.min_interval), self.max_interval)
+
+    def schedule(
+        self, key: str, price: float, threshold: float,
+        volatility: float | None, now: float = None
+    ) -> float:
+        """Sets the holding's next check and returns the interval in seconds."""
+        seconds = self.interval(price, threshold, volatility)
+        self.next_check[key] = (now or time.time()) + seconds
+
+        return seconds
+
+    def forget(self, key: str) -> None:
+        self.next_check.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "holdings": len(self.next_check),
+            "polled": self.polled,
+            "skipped": self.skipped,
+        }
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+
+class LastPriceTable:
+    """In-memory last observed price per base currency."""
+
+    def __init__(self, max_age: float = 60.0) -> None:
+        self.max_age: float = max_age
+        self.prices: dict = {}
+
+    def update(self, symbol: str, price: float, timestamp: float = None) -> bool:
+        """Stores the price and returns whether it differs from the previous one."""
+        previous = self.prices.get(symbol)
+        self.prices[symbol] = (price, timestamp or time.time())
+        return not previous or previous[0] != price
+
+    def get(self, symbol: str) -> float | None:
+        """Returns the last price if it is not older than `max_age` seconds."""
+        entry = self.prices.get(symbol)
+
+        if not entry or time.time() - entry[1] > self.max_age:
+            return None
+        return entry[0]
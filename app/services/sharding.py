@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from infra import log
+
+
+def stable_hash(key: str) -> int:
+    """Process-independent hash (the builtin `hash` is salted per interpreter)."""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class ConsistentHashRing:
+    """Consistent hash ring of worker ids with virtual nodes.
+
+    Adding or removing a worker only moves the keys that were (or will be)
+    owned by that worker, so the rest of the fleet keeps its shards.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64) -> None:
+        self.replicas: int = replicas
+        self._hashes: list = []
+        self._nodes: dict = {}
+
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        for replica in range(self.replicas):
+            point = stable_hash(f"{node}#{replica}")
+            if point in self._nodes:
+                continue
+            bisect.insort(self._hashes, point)
+            self._nodes[point] = node
+
+    def remove(self, node: str) -> None:
+        for replica in range(self.replicas):
+            point = stable_hash(f"{node}#{replica}")
+            if self._nodes.get(point) == node:
+                del self._nodes[point]
+                self._hashes.remove(point)
+
+    def get_node(self, key: str) -> str | None:
+        if not self._hashes:
+            return None
+
+        index = bisect.bisect(self._hashes, stable_hash(key)) % len(self._hashes)
+        return self._nodes[self._hashes[index]]
+
+
+class SQLiteLeaseStore:
+    """Shard leases and worker heartbeats kept in a local SQLite file.
+
+    `BEGIN IMMEDIATE` takes the database write lock, so acquire/renew is an
+    atomic compare-and-set between processes on the same host. The
+    connection is shared by the event loop and the holdings refresh thread,
+    so statements from this process are serialized by a lock.
+    """
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, expires_at REAL)"
+        )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases (shard INTEGER PRIMARY KEY, owner TEXT, expires_at REAL)"
+        )
+
+    def heartbeat(self, worker_id: str, ttl: float) -> None:
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO workers (worker_id, expires_at) VALUES (?, ?)",
+                (worker_id, time.time() + ttl)
+            )
+
+    def live_workers(self) -> list:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT worker_id FROM workers WHERE expires_at > ?", (time.time(),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+
+    def acquire(self, shard: int, worker_id: str, ttl: float) -> float | None:
+        now = time.time()
+        expires_at = now + ttl
+
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute(
+                    "SELECT owner, expires_at FROM leases WHERE shard = ?", (shard,)
+                ).fetchone()
+
+                if row and row[0] != worker_id and row[1] > now:
+                    self.connection.execute("ROLLBACK")
+                    return None
+
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO leases (shard, owner, expires_at) VALUES (?, ?, ?)",
+                    (shard, worker_id, expires_at)
+                )
+                self.connection.execute("COMMIT")
+                return expires_at
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def release(self, shard: int, worker_id: str) -> None:
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM leases WHERE shard = ? AND owner = ?", (shard, worker_id)
+            )
+
+
+class FirebaseLeaseStore:
+    """Shard leases and worker heartbeats kept under a Firebase reference.
+
+    Lease changes go through `Reference.transaction`, which retries on
+    concurrent writes, so only one worker can win an expired lease.
+    """
+
+    def __init__(self, connection: Any, root: str = "sharding") -> None:
+        self.connection = connection
+        self.root: str = root
+
+    def heartbeat(self, worker_id: str, ttl: float) -> None:
+        self.connection.child(f"{self.root}/workers/{worker_id}").set(
+            {"expires_at": time.time() + ttl}
+        )
+
+    def live_workers(self) -> list:
+        workers = self.connection.child(f"{self.root}/workers").get() or {}
+        now = time.time()
+        return [
+            worker_id for worker_id, worker in workers.items()
+            if float(worker.get("expires_at", 0)) > now
+        ]
+
+    def remove_worker(self, worker_id: str) -> None:
+        self.connection.child(f"{self.root}/workers/{worker_id}").delete()
+
+    def acquire(self, shard: int, worker_id: str, ttl: float) -> float | None:
+        now = time.time()
+        expires_at = now + ttl
+        won: dict = {"value": False}
+
+        def update(current):
+            won["value"] = False
+            if current and current.get("owner") != worker_id and float(current.get("expires_at", 0)) > now:
+                return current
+            won["value"] = True
+            return {"owner": worker_id, "expires_at": expires_at}
+
+        self.connection.child(f"{self.root}/leases/{shard}").transaction(update)
+
+        return expires_at if won["value"] else None
+
+    def release(self, shard: int, worker_id: str) -> None:
+        def update(current):
+            if current and current.get("owner") == worker_id:
+                return None
+            return current
+
+        self.connection.child(f"{self.root}/leases/{shard}").transaction(update)
+
+
+class ShardCoordinator:
+    """Decides which users this worker may evaluate.
+
+    Users are hashed into a fixed number of shards and shards are spread
+    over the live workers with a consistent hash ring. A worker only
+    evaluates a user while it holds an unexpired lease on the user's shard;
+    shards that move to another worker are released, and the new owner can
+    only take them once released or expired, so a user is never evaluated
+    by two workers at once. Callers pass the time they need the user for to
+    `owns` and check it again right before acting on the user's behalf.
+    """
+
+    def __init__(
+        self, store: Any, worker_id: str, shard_count: int = 64,
+        lease_ttl: float = 120.0, safety_margin: float = 15.0
+    ) -> None:
+        self.store = store
+        self.worker_id: str = worker_id
+        self.shard_count: int = shard_count
+        self.lease_ttl: float = lease_ttl
+        self.safety_margin: float = safety_margin
+        self.leases: dict = {}
+
+    def shard_of(self, user: str) -> int:
+        return stable_hash(str(user)) % self.shard_count
+
+    def rebalance(self) -> None:
+        self.store.heartbeat(self.worker_id, self.lease_ttl)
+
+        workers = set(self.store.live_workers())
+        workers.add(self.worker_id)
+        ring = ConsistentHashRing(sorted(workers))
+
+        assigned = {
+            shard for shard in range(self.shard_count)
+            if ring.get_node(str(shard)) == self.worker_id
+        }
+
+        for shard in list(self.leases.keys()):
+            if shard not in assigned:
+                self.store.release(shard, self.worker_id)
+                self.leases.pop(shard, None)
+
+        for shard in assigned:
+            expires_at = self.store.acquire(shard, self.worker_id, self.lease_ttl)
+            if expires_at:
+                self.leases[shard] = expires_at
+            else:
+                self.leases.pop(shard, None)
+
+        log.info(
+            f"[sharding] {self.worker_id}: {len(workers)} live workers, "
+            f"{len(self.leases)}/{len(assigned)} assigned shards leased"
+        )
+
+    def renew(self) -> None:
+        """
+        Heartbeat and renewal of the leases already held, without releasing
+        or taking shards. Safe to call from another thread while a user is
+        being evaluated; only `rebalance`, run between users, moves shards.
+        """
+        self.store.heartbeat(self.worker_id, self.lease_ttl)
+
+        for shard in list(self.leases.keys()):
+            expires_at = self.store.acquire(shard, self.worker_id, self.lease_ttl)
+            if expires_at:
+                self.leases[shard] = expires_at
+            else:
+                self.leases.pop(shard, None)
+
+    def owns(self, user: str, hold_for: float = 0.0) -> bool:
+        """
+        Whether this worker holds the user's shard for at least `hold_for`
+        more seconds beyond the safety margin, renewing the lease (and the
+        worker heartbeat with it) when it would run out sooner.
+        """
+        shard = self.shard_of(user)
+        expires_at = self.leases.get(shard)
+
+        if not expires_at:
+            return False
+
+        # A renewal grants lease_ttl, so never ask for more than that can cover.
+        hold_for = min(hold_for, self.lease_ttl - 2 * self.safety_margin)
+
+        if expires_at - time.time() > self.safety_margin + hold_for:
+            return True
+
+        renewed = self.store.acquire(shard, self.worker_id, self.lease_ttl)
+        if renewed:
+            self.leases[shard] = renewed
+            self.store.heartbeat(self.worker_id, self.lease_ttl)
+            return True
+
+        self.leases.pop(shard, None)
+        return False
+
+    def shutdown(self) -> None:
+        for shard in list(self.leases.keys()):
+            self.store.release(shard, self.worker_id)
+        self.leases.clear()
+        self.store.remove_worker(self.worker_id)
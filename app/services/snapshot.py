@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+from pathlib import Path
+
+import msgpack
+import numpy as np
+import pandas as pd
+
+from infra import log
+
+
+SNAPSHOT_VERSION: int = 1
+
+
+def pack_history(df: pd.DataFrame) -> dict:
+    """Price history as raw int64/float64 buffers instead of per-row objects."""
+    return {
+        "timestamp": df["timestamp"].to_numpy(dtype="int64").tobytes(),
+        "price": df["price"].to_numpy(dtype="float64").tobytes(),
+    }
+
+
+def unpack_history(packed: dict) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "timestamp": np.frombuffer(packed["timestamp"], dtype="int64"),
+        "price": np.frombuffer(packed["price"], dtype="float64"),
+    })
+    df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
+
+    return df[["timestamp", "datetime", "price"]]
+
+
+class WarmStateSnapshot:
+    """
+    Periodic msgpack snapshot of the evaluator's warm state, written
+    atomically and ignored on load when older than `max_age` seconds or
+    written by another snapshot version.
+    """
+
+    def __init__(self, path: str, max_age: float = 3600.0) -> None:
+        self.path = Path(path)
+        self.max_age: float = max_age
+
+    def save(self, state: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        payload = msgpack.packb(
+            {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "state": state},
+            use_bin_type=True
+        )
+
+        # Per-process name: every worker on the host shares SNAPSHOT_PATH.
+        temporary = self.path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(payload)
+        os.replace(temporary, self.path)
+
+        log.info(f"[WarmStateSnapshot] {len(payload) / 1024:.1f} KB saved to {self.path}")
+
+    def load(self) -> dict | None:
+        try:
+            snapshot = msgpack.unpackb(self.path.read_bytes(), raw=False, strict_map_key=False)
+        except FileNotFoundError:
+            return None
+        except (ValueError, msgpack.UnpackException) as error:
+            log.error(f"[WarmStateSnapshot] unreadable snapshot {self.path}: {error}")
+            return None
+
+        age = time.time() - snapshot.get("saved_at", 0)
+
+        if snapshot.get("version") != SNAPSHOT_VERSION or age > self.max_age:
+            log.info(f"[WarmStateSnapshot] discarding snapshot ({age:.0f}s old)")
+            return None
+
+        log.info(f"[WarmStateSnapshot] restoring snapshot ({age:.0f}s old)")
+
+        return snapshot["state"]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import bisect
+
+
+def sell_threshold_price(
+    base_balance: float, fixed_profit_brl: float, balance_available: float
+) -> float:
+    """
+    Lowest quote price at which a holding meets the sell rule: at least 10%
+    profit and at least `fixed_profit_brl + 0.3` above its base balance.
+
+    Lowered by 1e-4 BRL of position value so that the rounding done by the
+    evaluator's own check can never make the index miss a holding.
+    """
+    if balance_available <= 0:
+        return float("inf")
+
+    target_value = max(
+        base_balance * 1.1, base_balance + fixed_profit_brl + 0.3
+    )
+
+    return (target_value - 1e-4) / balance_available
+
+
+class SellThresholdIndex:
+    """
+    Per-symbol sorted array of sell threshold prices.
+
+    `triggered(symbol, price)` is a single bisect returning the holdings whose
+    threshold the price has reached, so a price update costs O(log n) plus
+    the triggered holdings instead of a check per holding.
+
+    Only the streaming pipeline is driven by the index. The poll loop
+    already pays an accounts request and a quote per holding, so it still
+    runs the sell check on every holding it polls; the adaptive poll
+    scheduler, when enabled, is what reduces its cost there.
+    """
+
+    def __init__(self) -> None:
+        self.thresholds: dict = {}
+        self.keys: dict = {}
+        self.entries: dict = {}
+
+    def symbols(self) -> list:
+        return [symbol for symbol, keys in self.keys.items() if keys]
+
+    def update(
+        self, symbol: str, key: str, base_balance: float,
+        fixed_profit_brl: float, balance_available: float
+    ) -> None:
+        threshold = sell_threshold_price(
+            float(base_balance), float(fixed_profit_brl), float(balance_available)
+        )
+
+        if self.entries.get(key) == (symbol, threshold):
+            return
+
+        self.remove(key)
+
+        thresholds = self.thresholds.setdefault(symbol, [])
+        keys = self.keys.setdefault(symbol, [])
+
+        position = bisect.bisect_right(thresholds, threshold)
+        thresholds.insert(position, threshold)
+        keys.insert(position, key)
+
+        self.entries[key] = (symbol, threshold)
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+
+        if not entry:
+            return
+
+        symbol, threshold = entry
+        thresholds, keys = self.thresholds[symbol], self.keys[symbol]
+
+        position = bisect.bisect_left(thresholds, threshold)
+        while keys[position] != key:
+            position += 1
+
+        del thresholds[position]
+        del keys[position]
+
+    def triggered(self, symbol: str, price: float) -> list:
+        thresholds = self.thresholds.get(symbol)
+
+        if not thresholds:
+            return []
+
+        return self.keys[symbol][:bisect.bisect_right(thresholds, price)]
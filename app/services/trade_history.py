@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+
+from infra import log
+
+
+class TradeHistoryStore:
+    """
+    Append-only JSON-lines file of fills per market, plus a cursor file
+    recording the newest ingested trade so later runs fetch only new ones.
+
+    The cursor also records the file size it covers. Lines past it were
+    appended by a run that died before advancing the cursor, and `recover`
+    truncates them, so a batch and its cursor land together or not at all.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def trades_path(self, market_symbol: str) -> Path:
+        return self.directory / f"{market_symbol}.jsonl"
+
+    def cursor_path(self, market_symbol: str) -> Path:
+        return self.directory / f"{market_symbol}.cursor.json"
+
+    def get_cursor(self, market_symbol: str) -> dict:
+        try:
+            return json.loads(self.cursor_path(market_symbol).read_text())
+        except FileNotFoundError:
+            return {"created_at": None, "ids": [], "offset": 0}
+
+    def set_cursor(self, market_symbol: str, cursor: dict) -> None:
+        path = self.cursor_path(market_symbol)
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(cursor))
+        os.replace(temporary, path)
+
+    def size(self, market_symbol: str) -> int:
+        path = self.trades_path(market_symbol)
+        return path.stat().st_size if path.exists() else 0
+
+    def recover(self, market_symbol: str, cursor: dict) -> None:
+        """Drops trades appended after the cursor was last written."""
+        offset = cursor.get("offset")
+
+        if offset is None or self.size(market_symbol) <= offset:
+            return
+
+        log.warn(f"[TradeHistoryStore] dropping an uncommitted batch of {market_symbol}")
+
+        with open(self.trades_path(market_symbol), "r+b") as file:
+            file.truncate(offset)
+
+    def append(self, market_symbol: str, trades: list) -> None:
+        with open(self.trades_path(market_symbol), "a", encoding="utf-8") as file:
+            for trade in trades:
+                file.write(json.dumps(trade, separators=(",", ":")) + "\n")
+
+    def trades(self, market_symbol: str) -> Iterator[dict]:
+        """Streams the stored trades in chronological order, one line at a time."""
+        path = self.trades_path(market_symbol)
+
+        if not path.exists():
+            return
+
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                yield json.loads(line)
+
+
+class TradeHistoryIngester:
+    """
+    Pulls a user's Foxbit fills page by page into a TradeHistoryStore.
+
+    The next `prefetch` pages are requested concurrently while the current
+    one is processed, only trades newer than the stored cursor are fetched,
+    and at most one page of trades is held in memory at a time.
+    """
+
+    TRADES_PATH: str = "/rest/v3/trades"
+
+    def __init__(
+        self, foxbit: Any, store: TradeHistoryStore,
+        page_size: int = 200, prefetch: int = 2
+    ) -> None:
+        self.foxbit = foxbit
+        self.store = store
+        self.page_size: int = page_size
+        self.prefetch: int = prefetch
+
+    def fetch_page(self, market_symbol: str, page: int, start_time: str | None) -> list:
+        params = {"market_symbol": market_symbol, "page": page, "page_size": self.page_size}
+        if start_time:
+            params["start_time"] = start_time
+
+        response = self.foxbit.request("GET", self.TRADES_PATH, params, None)
+
+        if not response:
+            raise RuntimeError(f"[TradeHistoryIngester] page {page} of {market_symbol} failed")
+
+        return response["data"]
+
+    def pages(self, market_symbol: str, start_time: str | None = None) -> Iterator[list]:
+        """Yields pages in API order, keeping `prefetch` requests in flight."""
+        with ThreadPoolExecutor(max_workers=self.prefetch) as executor:
+            in_flight: deque = deque()
+            next_page = 1
+
+            for _ in range(self.prefetch):
+                in_flight.append(executor.submit(self.fetch_page, market_symbol, next_page, start_time))
+                next_page += 1
+
+            while in_flight:
+                trades = in_flight.popleft().result()
+
+                if trades:
+                    yield trades
+
+                if len(trades) < self.page_size:
+                    for future in in_flight:
+                        future.cancel()
+                    return
+
+                in_flight.append(executor.submit(self.fetch_page, market_symbol, next_page, start_time))
+                next_page += 1
+
+    def new_trades(self, market_symbol: str, cursor: dict) -> Iterator[list]:
+        """Yields pages with the trades already covered by the cursor removed."""
+        seen = set(cursor["ids"])
+
+        for trades in self.pages(market_symbol, cursor["created_at"]):
+            fresh = [
+                trade for trade in trades
+                if not cursor["created_at"] or (
+                    trade["created_at"] > cursor["created_at"] or
+                    (trade["created_at"] == cursor["created_at"] and str(trade["id"]) not in seen)
+                )
+            ]
+
+            if fresh:
+                yield fresh
+
+    def ingest(self, market_symbol: str) -> int:
+        """
+        Appends the trades created since the last run, oldest first, and
+        advances the cursor. Returns how many trades were stored.
+
+        Pages are spilled to a temporary file while they stream in, so the
+        batch can be written chronologically whichever order the API pages
+        in, without holding more than one page in memory.
+        """
+        cursor = self.store.get_cursor(market_symbol)
+        self.store.recover(market_symbol, cursor)
+
+        offsets: list = []
+        first_created_at = last_created_at = None
+        newest: dict = dict(cursor)
+        count = 0
+
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as spill:
+            for trades in self.new_trades(market_symbol, cursor):
+                trades.sort(key=lambda trade: trade["created_at"])
+
+                offsets.append(spill.tell())
+                spill.write(json.dumps(trades) + "\n")
+
+                first_created_at = first_created_at or trades[0]["created_at"]
+                last_created_at = trades[-1]["created_at"]
+                count += len(trades)
+
+                for trade in trades:
+                    if newest["created_at"] is None or trade["created_at"] > newest["created_at"]:
+                        newest = {"created_at": trade["created_at"], "ids": [str(trade["id"])]}
+                    elif trade["created_at"] == newest["created_at"]:
+                        newest["ids"].append(str(trade["id"]))
+
+            if not offsets:
+                return 0
+
+            # Newest-first pagination: write the pages back to front.
+            if first_created_at > last_created_at:
+                offsets.reverse()
+
+            for offset in offsets:
+                spill.seek(offset)
+                self.store.append(market_symbol, json.loads(spill.readline()))
+
+        newest["offset"] = self.store.size(market_symbol)
+        self.store.set_cursor(market_symbol, newest)
+
+        log.info(f"[TradeHistoryIngester] {count} new trades stored for {market_symbol}")
+
+        return count
+
+    def history(self, market_symbol: str) -> Iterator[dict]:
+        """Brings the store up to date and streams the full history, oldest first."""
+        self.ingest(market_symbol)
+        yield from self.store.trades(market_symbol)
+
+
+def cost_basis(trades: Iterator[dict], quote_currency: str = "brl") -> dict:
+    """
+    Average-cost basis of the position built by the given fills, consumed
+    as a stream. Buys add their cost (plus fees paid in the quote currency),
+    sells remove quantity at the running average price.
+    """
+    quantity: float = 0.0
+    cost: float = 0.0
+
+    for trade in trades:
+        volume = float(trade["volume"])
+        price = float(trade["price"])
+
+        if trade["side"].upper() == "BUY":
+            fee = float(trade.get("fee") or 0)
+            fee_in_quote = (trade.get("fee_currency_symbol") or "").lower() == quote_currency
+
+            quantity += volume
+            cost += price * volume + (fee if fee_in_quote else 0.0)
+        elif quantity > 0:
+            sold = min(volume, quantity)
+            cost -= cost / quantity * sold
+            quantity -= sold
+
+    return {
+        "quantity": quantity,
+        "cost_basis": round(cost, 2),
+        "average_price": cost / quantity if quantity else 0.0
+    }
+
+
+if __name__ == "__main__":
+    from apis import Foxbit
+
+    foxbit = Foxbit(
+        api_key=os.getenv("FOXBIT_ACCESS_KEY"),
+        api_secret=os.getenv("FOXBIT_SECRET_KEY")
+    )
+
+    ingester = TradeHistoryIngester(
+        foxbit, TradeHistoryStore(str(Path(__file__).resolve().parent.parent / "data" / "trades"))
+    )
+
+    print(cost_basis(ingester.history("btcbrl")))
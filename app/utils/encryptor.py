@@ -12,6 +12,10 @@ class Encryptor:
     """Encryptor
     """
 
+    # PBKDF2 output per passphrase; deriving it costs 50k SHA-256 rounds and
+    # it was re-derived for every decrypt. Kept in memory only.
+    _derived_keys: dict = {}
+
     def __init__(self) -> None:
         if isinstance(ENCRYPTATION_KEY, str):
             self.encryptation_key: bytes = ENCRYPTATION_KEY.encode()
@@ -24,6 +28,9 @@ class Encryptor:
             raise ValueError("ENCRYPTATION_KEY environment variable is not set!")
 
     def get_encryption_key(self) -> bytes:
+        if self.encryptation_key in self._derived_keys:
+            return self._derived_keys[self.encryptation_key]
+
         salt = b"salt_"
 
         kdf = PBKDF2HMAC(
@@ -34,6 +41,8 @@ class Encryptor:
         )
         key: bytes = urlsafe_b64encode(kdf.derive(self.encryptation_key))
 
+        self._derived_keys[self.encryptation_key] = key
+
         return key
 
 